@@ -0,0 +1,115 @@
+"""In-memory document catalog published by the sync engine."""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Folder metadata inherited from index.md, shared by all documents in a folder
+FOLDER_METADATA_FIELDS = ["title", "version", "status", "language", "tags"]
+
+
+class DocumentCatalog:
+    """
+    Index of all synced documents, one record per document.
+
+    Records carry path_document, directory_group, source_file, checksum,
+    chunk_count and folder metadata. Lookups by path and directory listings
+    are dict operations, independent of collection size.
+
+    Directory groups (folders with an index.md) are also arranged in a
+    prefix tree, including intermediate folders without an index.md, with
+    "" as the registry root.
+    """
+
+    def __init__(self):
+        """Initialize empty catalog."""
+        self.generation: Optional[int] = None
+        self._documents: Dict[str, Dict] = {}
+        self._directories: Dict[str, List[str]] = {}
+        self._subdirectories: Dict[str, List[str]] = {}
+
+    def load(self, records: Iterable[Dict], generation: Optional[int] = None) -> None:
+        """Replace catalog contents with `records`."""
+        documents = {}
+        directories: Dict[str, List[str]] = {}
+
+        for record in records:
+            path = record.get("path_document")
+            if not path:
+                continue
+            documents[path] = record
+            directories.setdefault(record.get("directory_group", ""), []).append(path)
+
+        for paths in directories.values():
+            paths.sort()
+
+        # Link every directory group to its parent, up to the root
+        children: Dict[str, Set[str]] = {}
+        for directory_group in directories:
+            node = directory_group
+            while node:
+                parent = node.rpartition("/")[0]
+                children.setdefault(parent, set()).add(node)
+                node = parent
+        subdirectories = {parent: sorted(nodes) for parent, nodes in children.items()}
+
+        # Swap in one step so concurrent readers never see a partial catalog
+        self._documents, self._directories, self._subdirectories = (
+            documents, directories, subdirectories
+        )
+        self.generation = generation
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def get_document(self, path_document: str) -> Optional[Dict]:
+        """Return catalog record for a document, or None."""
+        return self._documents.get(path_document)
+
+    def has_directory(self, directory_group: str) -> bool:
+        """Check whether directory_group exists in the directory tree."""
+        return directory_group in self._directories or directory_group in self._subdirectories
+
+    def list_subdirectories(self, directory_group: str) -> List[str]:
+        """Return sorted child directory groups of directory_group."""
+        return list(self._subdirectories.get(directory_group, []))
+
+    def walk(self, directory_group: str, max_depth: int = 0) -> List[Tuple[str, str]]:
+        """
+        List the subtree under directory_group in a stable pre-order.
+
+        Each level yields its files, then each subdirectory followed by that
+        subdirectory's own entries. directory_group itself is depth 0, so
+        `max_depth` is the number of subdirectory levels whose contents are
+        listed (0 lists only directory_group's own files and subdirectories).
+
+        Returns:
+            List of ("file", path_document) and ("directory", directory_group) entries
+        """
+        entries: List[Tuple[str, str]] = []
+        stack: List[Tuple[str, int]] = [(directory_group, 0)]
+
+        while stack:
+            node, depth = stack.pop()
+            if node != directory_group:
+                entries.append(("directory", node))
+                if depth > max_depth:
+                    continue
+
+            entries.extend(("file", path) for path in self._directories.get(node, []))
+            for child in reversed(self._subdirectories.get(node, [])):
+                stack.append((child, depth + 1))
+
+        return entries
+
+    def list_files(self, directory_group: str) -> List[str]:
+        """Return sorted document paths directly in directory_group."""
+        return list(self._directories.get(directory_group, []))
+
+    def get_directory_metadata(self, directory_group: str) -> Dict:
+        """Return folder metadata (from index.md) for directory_group, or {}."""
+        paths = self._directories.get(directory_group)
+        if not paths:
+            return {}
+
+        record = self._documents[paths[0]]
+        return {field: record.get(field, [] if field == "tags" else "") for field in FOLDER_METADATA_FIELDS}
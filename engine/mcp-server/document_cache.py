@@ -0,0 +1,100 @@
+"""Generation-aware cache for document bodies."""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class DocumentCache:
+    """
+    Memory-capped LRU cache invalidated by the sync engine's generation marker.
+
+    Documents only change when the sync engine runs, and every run bumps a
+    generation number in Qdrant. Entries are valid for exactly one
+    generation: when `set_generation` sees a new value the cache is cleared.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize cache.
+
+        Args:
+            max_bytes: Approximate memory cap for cached values (0 disables the cache)
+        """
+        self.max_bytes = max(0, max_bytes)
+        self.generation: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+
+    def set_generation(self, generation: int) -> bool:
+        """
+        Record current sync generation, clearing the cache if it changed.
+
+        Returns True if the cache was invalidated.
+        """
+        with self._lock:
+            if generation == self.generation:
+                return False
+
+            invalidated = self.generation is not None
+            if invalidated:
+                self.invalidations += 1
+
+            self.generation = generation
+            self._entries.clear()
+            self._size_bytes = 0
+            return invalidated
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return cached value, or None on miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache value, evicting least recently used entries over the memory cap."""
+        size = self._estimate_size(value)
+        if not self.max_bytes or size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= previous[1]
+
+            self._entries[key] = (value, size)
+            self._size_bytes += size
+
+            while self._size_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size_bytes -= evicted_size
+
+    def stats(self) -> Dict:
+        """Return cache size, generation and hit/miss counters."""
+        with self._lock:
+            return {
+                "generation": self.generation,
+                "entries": len(self._entries),
+                "size_bytes": self._size_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        """Approximate memory footprint of a JSON-like value in bytes."""
+        return len(json.dumps(value, default=str).encode("utf-8"))
@@ -0,0 +1,108 @@
+"""Micro-batching scheduler for concurrent query embeddings."""
+
+import asyncio
+import logging
+from typing import Callable, List, Optional, Set, Tuple
+
+from inference import InferenceExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent encode requests into batched model calls.
+
+    Texts submitted by concurrent tool calls are collected for up to
+    `max_wait_ms` or until `max_batch_size` texts are pending, encoded in a
+    single forward pass on the inference executor, and each vector is handed
+    back to the caller that requested it.
+    """
+
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], List[List[float]]],
+        executor: InferenceExecutor,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        """
+        Initialize batcher.
+
+        Args:
+            encode_batch: Blocking function embedding a list of texts
+            executor: Inference executor the batches run on
+            max_batch_size: Flush as soon as this many texts are pending
+            max_wait_ms: Max time the first pending text waits for company
+        """
+        self.encode_batch = encode_batch
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        # Running batch tasks; the event loop only keeps weak references
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.texts = 0
+
+    async def encode(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, sharing forward passes with concurrent callers."""
+        if not texts:
+            return []
+
+        loop = asyncio.get_running_loop()
+        futures = []
+
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future))
+            futures.append(future)
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self) -> None:
+        """Dispatch all pending texts as batches of at most max_batch_size."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, []
+
+        for i in range(0, len(pending), self.max_batch_size):
+            batch = pending[i:i + self.max_batch_size]
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Encode one batch and resolve the waiting futures."""
+        self.batches += 1
+        self.texts += len(batch)
+        logger.debug(f"Encoding micro-batch of {len(batch)} texts")
+
+        try:
+            vectors = await self.executor.run(self.encode_batch, [text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    def stats(self) -> dict:
+        """Return batch count and average batch size."""
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+        }
@@ -0,0 +1,76 @@
+"""Bounded executor for CPU-bound model inference."""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceExecutor:
+    """
+    Runs blocking model calls off the event loop on a fixed-size thread pool.
+
+    Keeping inference on its own pool means Qdrant I/O in other tool calls is
+    never stuck behind an `encode`. Queue depth (calls waiting for a free
+    worker) is tracked so saturation shows up in the logs.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        """
+        Initialize executor.
+
+        Args:
+            max_workers: Number of concurrent inference threads
+        """
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="inference",
+        )
+        # Only touched from the event loop thread
+        self._in_flight = 0
+        self.total_calls = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of submitted calls waiting for a free worker."""
+        return max(0, self._in_flight - self.max_workers)
+
+    async def run(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run `fn(*args, **kwargs)` on the inference pool and await its result."""
+        loop = asyncio.get_running_loop()
+
+        self._in_flight += 1
+        self.total_calls += 1
+
+        if self.queue_depth > 0:
+            logger.warning(
+                f"Inference pool saturated: {self.queue_depth} queued "
+                f"({self.max_workers} workers busy)"
+            )
+        else:
+            logger.debug(f"Inference pool: {self.stats()}")
+
+        try:
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(fn, *args, **kwargs),
+            )
+        finally:
+            self._in_flight -= 1
+
+    def stats(self) -> Dict:
+        """Return worker count, in-flight calls and queue depth."""
+        return {
+            "workers": self.max_workers,
+            "in_flight": self._in_flight,
+            "queued": self.queue_depth,
+            "total_calls": self.total_calls,
+        }
+
+    def shutdown(self) -> None:
+        """Stop accepting work and release worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,139 @@
+"""ONNX Runtime embedding backend (optional, CPU)."""
+
+from pathlib import Path
+from typing import List, Optional, Union
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxEncoder:
+    """
+    Runs an exported transformer model with ONNX Runtime.
+
+    Mirrors the parts of `SentenceTransformer.encode` the server uses, so
+    it can replace the torch model as the query encoder (same code as the
+    sync engine's backend, which must load the same model file). The model directory is
+    expected to hold the .onnx file and the tokenizer files, as written by
+    `optimum-cli export onnx`. Models exported with the
+    sentence_transformers library output `sentence_embedding` directly;
+    otherwise `last_hidden_state` is pooled here (CLS for BGE-M3).
+
+    onnxruntime and transformers are imported lazily, so they are only
+    needed when this backend is selected.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        model_file: str = "model.onnx",
+        intra_op_threads: int = 0,
+        pooling: str = "cls",
+        max_length: int = 8192,
+    ):
+        """
+        Load ONNX model and tokenizer.
+
+        Args:
+            model_path: Directory with the exported model and tokenizer
+            model_file: ONNX file inside model_path (e.g. model_quantized.onnx for int8)
+            intra_op_threads: Threads per operator (0 lets ONNX Runtime decide)
+            pooling: "cls" or "mean", used when the model outputs token embeddings
+            max_length: Max tokens per text, longer texts are truncated
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        if pooling not in ("cls", "mean"):
+            raise ValueError(f"Unsupported pooling: {pooling}")
+
+        self.model_path = Path(model_path)
+        self.pooling = pooling
+        self.max_length = max_length
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+
+        self.session = ort.InferenceSession(
+            str(self.model_path / model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_path))
+
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+        output_names = [output.name for output in self.session.get_outputs()]
+        self._output_name = (
+            "sentence_embedding" if "sentence_embedding" in output_names else output_names[0]
+        )
+
+        logger.info(
+            f"ONNX model loaded: {self.model_path / model_file} "
+            f"(output: {self._output_name}, threads: {intra_op_threads or 'auto'})"
+        )
+
+    def get_sentence_embedding_dimension(self) -> Optional[int]:
+        """Embedding dimension, if the model declares a fixed one."""
+        dimension = self.session.get_outputs()[0].shape[-1]
+        return dimension if isinstance(dimension, int) else None
+
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+    ) -> np.ndarray:
+        """
+        Embed texts.
+
+        Returns:
+            float32 array of shape (len(texts), dimension), or (dimension,) for a single string
+        """
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        batches = []
+        for i in range(0, len(texts), max(1, batch_size)):
+            batches.append(self._encode_batch(texts[i:i + batch_size]))
+
+        embeddings = np.concatenate(batches) if batches else np.zeros((0, 0), dtype=np.float32)
+        if normalize_embeddings and len(embeddings):
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+
+        return embeddings[0] if single else embeddings
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Run one forward pass and pool token embeddings."""
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np",
+        )
+        inputs = {
+            name: np.asarray(value, dtype=np.int64)
+            for name, value in encoded.items()
+            if name in self._input_names
+        }
+
+        output = self.session.run([self._output_name], inputs)[0]
+        if output.ndim == 2:
+            return output.astype(np.float32)
+
+        if self.pooling == "cls":
+            return output[:, 0].astype(np.float32)
+
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        return ((output * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)).astype(np.float32)
+
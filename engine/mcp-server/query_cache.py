@@ -0,0 +1,97 @@
+"""In-process LRU + TTL cache for query embeddings."""
+
+import re
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU cache mapping (model name, normalized query) to a query vector.
+
+    Agents repeat the same queries constantly, so a cache hit skips the
+    embedding model entirely. Entries expire after `ttl_seconds` and the
+    least recently used entry is evicted once `max_size` is reached.
+    """
+
+    _WHITESPACE = re.compile(r"\s+")
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600.0):
+        """
+        Initialize cache.
+
+        Args:
+            max_size: Maximum number of cached vectors (0 disables the cache)
+            ttl_seconds: Time-to-live per entry in seconds (0 = no expiry)
+        """
+        self.max_size = max(0, max_size)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def normalize_query(cls, query: str) -> str:
+        """Normalize query text for use as cache key (NFC, collapsed whitespace)."""
+        query = unicodedata.normalize("NFC", query)
+        return cls._WHITESPACE.sub(" ", query).strip()
+
+    def get(self, model_name: str, query: str) -> Optional[List[float]]:
+        """Return cached vector for query, or None on miss/expiry."""
+        if not self.max_size:
+            return None
+
+        key = (model_name, self.normalize_query(query))
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, vector = entry
+            if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, model_name: str, query: str, vector: List[float]) -> None:
+        """Store vector for query, evicting least recently used entries."""
+        if not self.max_size:
+            return
+
+        key = (model_name, self.normalize_query(query))
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Return cache size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -3,23 +3,35 @@
 Agentix Context Library - MCP Server
 
 Provides AI agents with semantic search and document access via MCP protocol.
-Tools: search_context, read_content, list_directory, get_metadata
+Tools: search_context, search_context_batch, read_content, list_directory, get_metadata
 
 Framework: FastMCP (jlowin/fastmcp)
 Auth: BearerTokenAuth via MCP_API_KEY environment variable
 """
 
 import os
+import json
+import time
+import base64
+import asyncio
+import uuid
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 from fastmcp import FastMCP
 from fastmcp.server.auth import StaticTokenVerifier
 
-from qdrant_client import QdrantClient
-from qdrant_client.models import Filter, FieldCondition, MatchValue, MatchAny
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.models import Filter, FieldCondition, MatchValue, MatchAny, QueryRequest
+from pydantic import BaseModel
 from sentence_transformers import SentenceTransformer
 
+from catalog import DocumentCatalog, FOLDER_METADATA_FIELDS
+from document_cache import DocumentCache
+from embedding_batcher import EmbeddingBatcher
+from inference import InferenceExecutor
+from query_cache import QueryEmbeddingCache
+
 
 # Configure logging
 logging.basicConfig(
@@ -31,9 +43,44 @@ logger = logging.getLogger(__name__)
 # Configuration from environment
 QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
 COLLECTION_NAME = os.getenv("COLLECTION_NAME", "context_library")
+CONTENT_COLLECTION_NAME = os.getenv("CONTENT_COLLECTION_NAME") or f"{COLLECTION_NAME}_content"
+CATALOG_COLLECTION_NAME = os.getenv("CATALOG_COLLECTION_NAME") or f"{COLLECTION_NAME}_catalog"
 EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "BAAI/bge-m3")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+ONNX_MODEL_PATH = os.getenv("ONNX_MODEL_PATH", "")
+ONNX_MODEL_FILE = os.getenv("ONNX_MODEL_FILE", "model.onnx")
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))
 VECTOR_SIZE = int(os.getenv("VECTOR_SIZE", "1024"))
 MCP_API_KEY = os.getenv("MCP_API_KEY")
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "3600"))
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "2"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+DOCUMENT_CACHE_MAX_BYTES = int(os.getenv("DOCUMENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+GENERATION_CHECK_INTERVAL = float(os.getenv("GENERATION_CHECK_INTERVAL", "10"))
+MAX_BATCH_QUERIES = 20
+MAX_LIST_LIMIT = 1000
+MAX_LIST_DEPTH = 10
+
+# Reserved point in the content collection where the sync engine publishes
+# its generation (must match QdrantManager.GENERATION_POINT_ID)
+GENERATION_POINT_ID = str(uuid.uuid5(uuid.NAMESPACE_DNS, "__generation__"))
+
+# Payload fields returned by search tools. Searches request only these from
+# Qdrant so large payload fields (e.g. full_content) never cross the wire.
+SEARCH_METADATA_FIELDS = [
+    "path_document",
+    "source_file",
+    "directory_group",
+    "chunk_index",
+    "title",
+    "version",
+    "status",
+    "language",
+    "tags",
+]
+SEARCH_PAYLOAD_FIELDS = ["chunk_text"] + SEARCH_METADATA_FIELDS
 
 # Initialize FastMCP with StaticTokenVerifier (Bearer Token)
 if MCP_API_KEY:
@@ -56,8 +103,48 @@ mcp = FastMCP(
 )
 
 # Global instances (initialized on startup)
-qdrant_client: Optional[QdrantClient] = None
-embedding_model: Optional[SentenceTransformer] = None
+qdrant_client: Optional[AsyncQdrantClient] = None
+embedding_model = None  # SentenceTransformer, or OnnxEncoder for EMBEDDING_BACKEND=onnx
+query_cache = QueryEmbeddingCache(max_size=QUERY_CACHE_SIZE, ttl_seconds=QUERY_CACHE_TTL)
+inference_executor = InferenceExecutor(max_workers=EMBEDDING_WORKERS)
+document_cache = DocumentCache(max_bytes=DOCUMENT_CACHE_MAX_BYTES)
+catalog = DocumentCatalog()
+catalog_lock = asyncio.Lock()
+generation_checked_at = 0.0
+
+
+def encode_batch(texts: List[str]) -> List[List[float]]:
+    """Embed texts in a single forward pass (runs on the inference executor)."""
+    return embedding_model.encode(
+        texts,
+        batch_size=len(texts),
+        normalize_embeddings=True,
+    ).tolist()
+
+
+embedding_batcher = EmbeddingBatcher(
+    encode_batch=encode_batch,
+    executor=inference_executor,
+    max_batch_size=EMBEDDING_BATCH_SIZE,
+    max_wait_ms=EMBEDDING_BATCH_WAIT_MS,
+)
+
+
+def load_embedding_model():
+    """Load the query encoder for the configured backend."""
+    if EMBEDDING_BACKEND == "onnx":
+        if not ONNX_MODEL_PATH:
+            raise RuntimeError("ONNX_MODEL_PATH must be set when EMBEDDING_BACKEND=onnx")
+        # Imported lazily: onnxruntime is only needed for this backend
+        from onnx_backend import OnnxEncoder
+        return OnnxEncoder(
+            ONNX_MODEL_PATH,
+            model_file=ONNX_MODEL_FILE,
+            intra_op_threads=ONNX_INTRA_OP_THREADS,
+        )
+    if EMBEDDING_BACKEND != "torch":
+        raise RuntimeError(f"EMBEDDING_BACKEND must be 'torch' or 'onnx', got: {EMBEDDING_BACKEND}")
+    return SentenceTransformer(EMBEDDING_MODEL_NAME)
 
 
 def initialize_services():
@@ -65,11 +152,11 @@ def initialize_services():
     global qdrant_client, embedding_model
 
     logger.info(f"Connecting to Qdrant at {QDRANT_URL}")
-    qdrant_client = QdrantClient(url=QDRANT_URL)
 
-    # Verify collection exists
+    # Verify collection exists (blocking client, startup only)
+    startup_client = QdrantClient(url=QDRANT_URL)
     try:
-        qdrant_client.get_collection(COLLECTION_NAME)
+        startup_client.get_collection(COLLECTION_NAME)
         logger.info(f"Connected to collection '{COLLECTION_NAME}'")
     except Exception as e:
         logger.warning(f"Collection '{COLLECTION_NAME}' not found. Run sync-engine first.")
@@ -77,45 +164,59 @@ def initialize_services():
             f"Collection '{COLLECTION_NAME}' does not exist. "
             "Please run the sync engine to initialize the database."
         ) from e
+    finally:
+        startup_client.close()
+
+    # Load document catalog before serving requests
+    asyncio.run(load_startup_catalog())
+
+    # Tool handlers share one async client on the server event loop
+    qdrant_client = AsyncQdrantClient(url=QDRANT_URL)
 
-    logger.info(f"Loading embedding model: {EMBEDDING_MODEL_NAME}")
-    embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+    logger.info(f"Loading embedding model: {EMBEDDING_MODEL_NAME} ({EMBEDDING_BACKEND} backend)")
+    embedding_model = load_embedding_model()
     logger.info(f"Model loaded. Dimension: {embedding_model.get_sentence_embedding_dimension()}")
+    logger.info(
+        f"Inference executor: {EMBEDDING_WORKERS} workers, micro-batches of up to "
+        f"{EMBEDDING_BATCH_SIZE} queries / {EMBEDDING_BATCH_WAIT_MS}ms"
+    )
 
 
-@mcp.tool()
-def search_context(
-    query: str,
-    top_k: int = 5,
-    status: Optional[str] = None,
-    directory_group: Optional[str] = None,
-    language: Optional[str] = None,
-    tags: Optional[List[str]] = None
-) -> List[Dict]:
-    """
-    Search context library with semantic query and optional filters.
+async def embed_query(query: str) -> List[float]:
+    """Embed a search query, serving repeated queries from the LRU cache."""
+    return (await embed_queries([query]))[0]
 
-    Args:
-        query: Natural language search query
-        top_k: Number of results to return (1-20, default 5)
-        status: Filter by status: "draft", "stable", or "deprecated"
-        directory_group: Filter by directory group (e.g., "backend/auth")
-        language: Filter by language: "id" or "en"
-        tags: Filter by tags (returns docs matching ANY tag)
 
-    Returns:
-        List of matching chunks with metadata and relevance scores
+async def embed_queries(queries: List[str]) -> List[List[float]]:
     """
-    if not qdrant_client or not embedding_model:
-        raise RuntimeError("Server not initialized. Call initialize_services() first.")
+    Embed several search queries with one batched forward pass.
 
-    # Validate top_k
-    top_k = max(1, min(20, top_k))
+    Cached queries are served from the LRU cache; only misses hit the model,
+    through the micro-batcher so concurrent callers share forward passes.
+    """
+    vectors: List[Optional[List[float]]] = [
+        query_cache.get(EMBEDDING_MODEL_NAME, query) for query in queries
+    ]
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
 
-    # Embed query
-    query_vector = embedding_model.encode(query, normalize_embeddings=True).tolist()
+    if missing:
+        encoded = await embedding_batcher.encode([queries[i] for i in missing])
 
-    # Build filters
+        for i, vector in zip(missing, encoded):
+            vectors[i] = vector
+            query_cache.put(EMBEDDING_MODEL_NAME, queries[i], vector)
+
+    logger.debug(f"Query cache: {query_cache.stats()}, batcher: {embedding_batcher.stats()}")
+    return vectors
+
+
+def build_search_filter(
+    status: Optional[str] = None,
+    directory_group: Optional[str] = None,
+    language: Optional[str] = None,
+    tags: Optional[List[str]] = None
+) -> Optional[Filter]:
+    """Build Qdrant filter from optional search filters."""
     filter_conditions = []
 
     if status:
@@ -138,154 +239,465 @@ def search_context(
             FieldCondition(key="tags", match=MatchAny(any=tags))
         )
 
-    # Create filter object
-    search_filter = Filter(must=filter_conditions) if filter_conditions else None
+    return Filter(must=filter_conditions) if filter_conditions else None
+
+
+def resolve_search_fields(fields: Optional[List[str]] = None) -> List[str]:
+    """
+    Validate requested search fields, defaulting to all of them.
+
+    Raises:
+        ValueError if an unknown field is requested
+    """
+    if not fields:
+        return SEARCH_PAYLOAD_FIELDS
+
+    unknown = set(fields) - set(SEARCH_PAYLOAD_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {sorted(unknown)}. Allowed: {SEARCH_PAYLOAD_FIELDS}"
+        )
+
+    return [field for field in SEARCH_PAYLOAD_FIELDS if field in fields]
+
+
+def format_search_results(results, fields: List[str]) -> List[Dict]:
+    """Format scored Qdrant points as search results with the selected fields."""
+    formatted_results = []
+    for result in results:
+        formatted = {"score": round(result.score, 4)}
+
+        if "chunk_text" in fields:
+            formatted["chunk_text"] = result.payload.get("chunk_text", "")
+
+        formatted["metadata"] = {
+            field: result.payload.get(field, [] if field == "tags" else None)
+            for field in fields
+            if field != "chunk_text"
+        }
+        formatted_results.append(formatted)
+    return formatted_results
+
+
+def document_point_id(path_document: str, chunk_index: int) -> str:
+    """Deterministic chunk point ID (must match the sync engine's _generate_document_id)."""
+    return str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{path_document}#{chunk_index}"))
+
+
+def content_point_id(checksum: str) -> str:
+    """Content store point ID (must match the sync engine's _generate_content_id)."""
+    return str(uuid.uuid5(uuid.NAMESPACE_DNS, checksum))
+
+
+async def read_generation(client: AsyncQdrantClient) -> Optional[int]:
+    """Read the sync generation marker (None if the sync engine never published one)."""
+    results = await client.retrieve(
+        collection_name=CONTENT_COLLECTION_NAME,
+        ids=[GENERATION_POINT_ID],
+        with_payload=["generation"]
+    )
+    if results:
+        return results[0].payload.get("generation", 0)
+    return None
+
+
+async def load_catalog(client: AsyncQdrantClient, generation: Optional[int]) -> None:
+    """Load all catalog records published by the sync engine into memory."""
+    records = []
+    offset = None
+
+    while True:
+        points, next_offset = await client.scroll(
+            collection_name=CATALOG_COLLECTION_NAME,
+            limit=1000,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False
+        )
+        records.extend(point.payload for point in points)
+
+        if next_offset is None:
+            break
+        offset = next_offset
+
+    catalog.load(records, generation)
+    logger.info(f"Loaded catalog: {len(catalog)} documents (generation {generation})")
+
+
+async def load_startup_catalog() -> None:
+    """Load the catalog with a short-lived client before the server starts."""
+    client = AsyncQdrantClient(url=QDRANT_URL)
+    try:
+        generation = await read_generation(client)
+        if generation is None:
+            raise RuntimeError("no sync generation marker")
+        await load_catalog(client, generation)
+        document_cache.set_generation(generation)
+    except Exception as e:
+        raise RuntimeError(
+            f"Document catalog '{CATALOG_COLLECTION_NAME}' could not be loaded ({e}). "
+            "Please run the sync engine to publish it."
+        ) from e
+    finally:
+        await client.close()
+
+
+async def refresh_generation(force: bool = False) -> None:
+    """
+    Reload the catalog and drop cached bodies when the sync generation changes.
+
+    The marker is polled at most every GENERATION_CHECK_INTERVAL seconds,
+    unless `force` is set. On errors the current catalog keeps being served.
+    """
+    global generation_checked_at
+
+    now = time.monotonic()
+    if not force and now - generation_checked_at < GENERATION_CHECK_INTERVAL:
+        return
+    generation_checked_at = now
+
+    try:
+        generation = await read_generation(qdrant_client)
+        if generation is None or generation == catalog.generation:
+            return
+
+        async with catalog_lock:
+            if generation != catalog.generation:
+                await load_catalog(qdrant_client, generation)
+    except Exception as e:
+        logger.warning(f"Could not refresh catalog, serving generation {catalog.generation}: {e}")
+        return
+
+    if document_cache.set_generation(generation):
+        logger.info(f"Sync generation changed to {generation}, document cache invalidated")
+
+
+async def read_content_store(checksum: str) -> Optional[str]:
+    """
+    Fetch a document body from the content store by checksum.
+
+    Returns None only if the body is missing; lookup errors propagate so a
+    transient failure is never mistaken for a missing body.
+    """
+    results = await qdrant_client.retrieve(
+        collection_name=CONTENT_COLLECTION_NAME,
+        ids=[content_point_id(checksum)],
+        with_payload=["content"]
+    )
+    if results:
+        return results[0].payload.get("content")
+    return None
+
+
+async def read_legacy_body(path_document: str) -> Tuple[str, bool]:
+    """
+    Read a document body from chunk 0 of the chunk collection.
+
+    Used for collections synced before the content store existed: returns
+    the legacy `full_content` payload, and finally the first chunk's text.
+
+    Returns:
+        (content, complete) - complete is False for the partial-chunk fallback
+    """
+    results = await qdrant_client.retrieve(
+        collection_name=COLLECTION_NAME,
+        ids=[document_point_id(path_document, 0)],
+        with_payload=["full_content", "chunk_text"]
+    )
+    payload = results[0].payload if results else {}
+
+    content = payload.get("full_content")
+    if content is None:
+        content = payload.get("chunk_text", "") + "\n\n[WARNING: Full content not found in Vector DB. Showing partial chunk.]"
+        return content, False
+    return content, True
+
+
+def get_document_record(path_document: str) -> Dict:
+    """Catalog record of a document; raises FileNotFoundError if it is not synced."""
+    record = catalog.get_document(path_document)
+    if record is None:
+        raise FileNotFoundError(
+            f"Document not found in vector database: {path_document}. "
+            f"Use list_directory to browse available documents."
+        )
+    return record
+
+
+def encode_cursor(directory_group: str, depth: int, offset: int) -> str:
+    """Encode an opaque list_directory cursor bound to the catalog generation and listing."""
+    state = {"g": catalog.generation, "d": directory_group, "m": depth, "o": offset}
+    return base64.urlsafe_b64encode(json.dumps(state).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, directory_group: str, depth: int) -> int:
+    """
+    Decode a list_directory cursor into an entry offset.
+
+    Raises:
+        ValueError if the cursor is malformed, belongs to another directory
+        or listing depth, or was issued before the registry was re-synced
+    """
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        offset = int(state["o"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    if state.get("d") != directory_group:
+        raise ValueError("Cursor belongs to a different directory_group.")
+    if state.get("m") != depth:
+        raise ValueError("Cursor was issued with different recursive/max_depth settings.")
+    if state.get("g") != catalog.generation:
+        raise ValueError("Cursor expired: the registry was re-synced. Restart the listing without a cursor.")
+
+    return max(0, offset)
+
+
+def folder_metadata(record: Dict) -> Dict:
+    """Extract folder metadata (inherited from index.md) from a catalog record."""
+    return {
+        field: record.get(field, [] if field == "tags" else "")
+        for field in FOLDER_METADATA_FIELDS
+    }
+
+
+class SearchQuery(BaseModel):
+    """A single query in a search_context_batch request."""
+    query: str
+    top_k: int = 5
+    status: Optional[str] = None
+    directory_group: Optional[str] = None
+    language: Optional[str] = None
+    tags: Optional[List[str]] = None
+    fields: Optional[List[str]] = None
+
+
+@mcp.tool()
+async def search_context(
+    query: str,
+    top_k: int = 5,
+    status: Optional[str] = None,
+    directory_group: Optional[str] = None,
+    language: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    fields: Optional[List[str]] = None
+) -> List[Dict]:
+    """
+    Search context library with semantic query and optional filters.
+
+    Args:
+        query: Natural language search query
+        top_k: Number of results to return (1-20, default 5)
+        status: Filter by status: "draft", "stable", or "deprecated"
+        directory_group: Filter by directory group (e.g., "backend/auth")
+        language: Filter by language: "id" or "en"
+        tags: Filter by tags (returns docs matching ANY tag)
+        fields: Payload fields to return (default: all). Omit "chunk_text"
+            for metadata-only results, e.g. ["path_document", "title"]
+
+    Returns:
+        List of matching chunks with metadata and relevance scores
+    """
+    if not qdrant_client or not embedding_model:
+        raise RuntimeError("Server not initialized. Call initialize_services() first.")
+
+    # Validate top_k and requested fields
+    top_k = max(1, min(20, top_k))
+    fields = resolve_search_fields(fields)
+
+    # Embed query (cached)
+    query_vector = await embed_query(query)
+
+    # Build filters
+    search_filter = build_search_filter(status, directory_group, language, tags)
+    filter_count = len(search_filter.must) if search_filter else 0
 
     # Execute search using query_points
-    logger.info(f"Searching: '{query}' (top_k={top_k}, filters={len(filter_conditions)})")
-    results = qdrant_client.query_points(
+    logger.info(f"Searching: '{query}' (top_k={top_k}, filters={filter_count})")
+    results = (await qdrant_client.query_points(
         collection_name=COLLECTION_NAME,
         query=query_vector,
         query_filter=search_filter,
         limit=top_k,
-        with_payload=True
-    ).points
+        with_payload=fields
+    )).points
 
     # Format results
-    formatted_results = []
-    for result in results:
-        formatted_results.append({
-            "score": round(result.score, 4),
-            "chunk_text": result.payload.get("chunk_text", ""),
-            "metadata": {
-                "path_document": result.payload.get("path_document"),
-                "source_file": result.payload.get("source_file"),
-                "directory_group": result.payload.get("directory_group"),
-                "chunk_index": result.payload.get("chunk_index"),
-                "title": result.payload.get("title"),
-                "version": result.payload.get("version"),
-                "status": result.payload.get("status"),
-                "language": result.payload.get("language"),
-                "tags": result.payload.get("tags", []),
-            }
-        })
+    formatted_results = format_search_results(results, fields)
 
     logger.info(f"Found {len(formatted_results)} results")
     return formatted_results
 
 
 @mcp.tool()
-def read_content(path_document: str) -> Dict:
+async def search_context_batch(queries: List[SearchQuery]) -> List[Dict]:
     """
-    Read full content of a document with metadata.
+    Run several semantic searches in one call.
+
+    All queries are embedded in a single batched forward pass and sent to
+    Qdrant as one batch request. Prefer this over repeated search_context
+    calls when a plan needs multiple related searches.
 
     Args:
-        path_document: Relative path to document (e.g., "backend/auth/keycloak-setup.md")
+        queries: List of searches (1-20). Each item accepts the same fields
+            as search_context: query, top_k, status, directory_group,
+            language, tags, fields
 
     Returns:
-        Document content and metadata from parent index.md
+        One entry per query, in request order, with the query text and its results
     """
-    if not qdrant_client:
-        raise RuntimeError("Server not initialized.")
+    if not qdrant_client or not embedding_model:
+        raise RuntimeError("Server not initialized. Call initialize_services() first.")
+
+    if not queries:
+        return []
+
+    if len(queries) > MAX_BATCH_QUERIES:
+        raise ValueError(
+            f"Too many queries in batch: {len(queries)} (max {MAX_BATCH_QUERIES})"
+        )
 
-    results, _ = qdrant_client.scroll(
+    # Validate requested fields per query
+    query_fields = [resolve_search_fields(q.fields) for q in queries]
+
+    # Embed all queries at once (cached)
+    query_vectors = await embed_queries([q.query for q in queries])
+
+    # Build one query request per search
+    requests = []
+    for q, query_vector, fields in zip(queries, query_vectors, query_fields):
+        requests.append(QueryRequest(
+            query=query_vector,
+            filter=build_search_filter(q.status, q.directory_group, q.language, q.tags),
+            limit=max(1, min(20, q.top_k)),
+            with_payload=fields
+        ))
+
+    # Execute all searches in a single round trip
+    logger.info(f"Batch searching: {len(queries)} queries")
+    responses = await qdrant_client.query_batch_points(
         collection_name=COLLECTION_NAME,
-        scroll_filter=Filter(
-            must=[
-                FieldCondition(key="path_document", match=MatchValue(value=path_document)),
-                FieldCondition(key="chunk_index", match=MatchValue(value=0))
-            ]
-        ),
-        limit=1,
-        with_payload=True
+        requests=requests
     )
 
-    if not results:
-        raise FileNotFoundError(
-            f"Document not found in vector database: {path_document}. "
-            f"Use list_directory to browse available documents."
-        )
+    batch_results = []
+    for q, response, fields in zip(queries, responses, query_fields):
+        batch_results.append({
+            "query": q.query,
+            "results": format_search_results(response.points, fields)
+        })
 
-    # Extract content and metadata
-    payload = results[0].payload
-    content = payload.get("full_content")
+    logger.info(f"Batch returned {sum(len(r['results']) for r in batch_results)} results")
+    return batch_results
 
-    # Fallback if full_content is missing
-    if content is None:
-        content = payload.get("chunk_text", "") + "\n\n[WARNING: Full content not found in Vector DB. Showing partial chunk.]"
 
-    metadata = {
-        "title": payload.get("title", ""),
-        "version": payload.get("version", ""),
-        "status": payload.get("status", ""),
-        "language": payload.get("language", ""),
-        "tags": payload.get("tags", [])
-    }
+@mcp.tool()
+async def read_content(path_document: str) -> Dict:
+    """
+    Read full content of a document with metadata.
 
-    logger.info(f"Read document from DB: {path_document} ({len(content)} bytes)")
+    Args:
+        path_document: Relative path to document (e.g., "backend/auth/keycloak-setup.md")
+
+    Returns:
+        Document content and metadata from parent index.md
+    """
+    if not qdrant_client:
+        raise RuntimeError("Server not initialized.")
+
+    await refresh_generation()
+
+    record = get_document_record(path_document)
+
+    # Bodies are content-addressed, so a cached body is valid for its checksum
+    checksum = record.get("checksum", "")
+    content = document_cache.get(("content", checksum))
+
+    if content is not None:
+        logger.info(f"Read document from cache: {path_document} ({len(content)} bytes)")
+    else:
+        content = await read_content_store(checksum)
+        if content is None:
+            # The catalog may predate the last sync, which already pruned
+            # this body: reload it and retry with the current checksum
+            await refresh_generation(force=True)
+            record = get_document_record(path_document)
+            if record.get("checksum", "") != checksum:
+                checksum = record.get("checksum", "")
+                content = await read_content_store(checksum)
+        complete = True
+        if content is None:
+            content, complete = await read_legacy_body(path_document)
+        if complete:
+            # Never pin the partial-chunk fallback for the whole generation
+            document_cache.put(("content", checksum), content)
+        logger.info(f"Read document from DB: {path_document} ({len(content)} bytes)")
 
     return {
         "path_document": path_document,
         "content": content,
-        "metadata": metadata,
+        "metadata": folder_metadata(record),
         "size_bytes": len(content.encode("utf-8"))
     }
 
 
 @mcp.tool()
-def list_directory(directory_group: str) -> Dict:
+async def list_directory(
+    directory_group: str = "",
+    recursive: bool = False,
+    max_depth: int = 3,
+    limit: int = 200,
+    cursor: Optional[str] = None
+) -> Dict:
     """
     List all files and subdirectories in a directory group.
 
     Args:
-        directory_group: Directory path (e.g., "backend/auth" or "backend")
+        directory_group: Directory path (e.g., "backend/auth" or "backend"; "" for the registry root)
+        recursive: Also list the contents of subdirectories
+        max_depth: Subdirectory levels whose contents are listed when recursive (1-10, default 3;
+            1 also lists the files of each direct subdirectory)
+        limit: Max entries (files + subdirectories) per page (1-1000, default 200)
+        cursor: next_cursor from a previous call, to fetch the next page
 
     Returns:
-        Files, subdirectories, and metadata from index.md
+        Files, subdirectories, metadata from index.md, and next_cursor (null on the last page)
     """
     if not qdrant_client:
         raise RuntimeError("Server not initialized.")
 
-    results, _ = qdrant_client.scroll(
-        collection_name=COLLECTION_NAME,
-        scroll_filter=Filter(
-            must=[FieldCondition(key="directory_group", match=MatchValue(value=directory_group))]
-        ),
-        limit=1000,
-        with_payload=True
-    )
+    await refresh_generation()
 
-    # Extract unique file paths
-    files = set()
-    metadata = {}
+    directory_group = directory_group.strip("/")
+    depth = max(1, min(MAX_LIST_DEPTH, max_depth)) if recursive else 0
+    limit = max(1, min(MAX_LIST_LIMIT, limit))
+    offset = decode_cursor(cursor, directory_group, depth) if cursor else 0
 
-    for point in results:
-        path_doc = point.payload.get("path_document")
-        if path_doc:
-            files.add(path_doc)
+    entries = catalog.walk(directory_group, depth)
+    page = entries[offset:offset + limit]
+    next_offset = offset + len(page)
 
-        # Capture metadata from any chunk (they share the same folder metadata)
-        if not metadata and point.payload.get("status"):
-            metadata = {
-                "title": point.payload.get("title", ""),
-                "version": point.payload.get("version", ""),
-                "status": point.payload.get("status", ""),
-                "language": point.payload.get("language", ""),
-                "tags": point.payload.get("tags", [])
-            }
+    files = [path for kind, path in page if kind == "file"]
+    subdirectories = [path for kind, path in page if kind == "directory"]
 
-    logger.info(f"Listed directory via DB: {directory_group} ({len(files)} files)")
+    logger.info(
+        f"Listed directory via catalog: {directory_group or '/'} "
+        f"({len(files)} files, {len(subdirectories)} subdirectories, depth={depth})"
+    )
 
     return {
         "directory_group": directory_group,
-        "files": sorted(list(files)),
-        "subdirectories": [],
-        "metadata": metadata
+        "files": files,
+        "subdirectories": subdirectories,
+        "metadata": catalog.get_directory_metadata(directory_group),
+        "total_entries": len(entries),
+        "next_cursor": encode_cursor(directory_group, depth, next_offset) if next_offset < len(entries) else None
     }
 
 
 @mcp.tool()
-def get_metadata(path_document: str) -> Dict:
+async def get_metadata(path_document: str) -> Dict:
     """
     Get metadata for a document or directory without content.
 
@@ -298,37 +710,36 @@ def get_metadata(path_document: str) -> Dict:
     if not qdrant_client:
         raise RuntimeError("Server not initialized.")
 
-    results, _ = qdrant_client.scroll(
-        collection_name=COLLECTION_NAME,
-        scroll_filter=Filter(
-            must=[FieldCondition(key="path_document", match=MatchValue(value=path_document))]
-        ),
-        limit=1000,
-        with_payload=True
-    )
+    await refresh_generation()
 
-    if not results:
+    record = catalog.get_document(path_document)
+
+    if record is None and catalog.has_directory(path_document):
+        files = catalog.list_files(path_document)
+        logger.info(f"Retrieved directory metadata: {path_document} ({len(files)} files)")
+        return {
+            "directory_group": path_document,
+            **catalog.get_directory_metadata(path_document),
+            "file_count": len(files),
+            "chunk_count": sum(catalog.get_document(f).get("chunk_count", 0) for f in files)
+        }
+
+    if record is None:
         raise FileNotFoundError(
             f"Document not found in vector database: {path_document}. "
             "This document may not exist or hasn't been synced yet."
         )
 
-    # Aggregate metadata from first chunk
-    first_chunk = results[0].payload
     metadata = {
         "path_document": path_document,
-        "title": first_chunk.get("title", ""),
-        "version": first_chunk.get("version", ""),
-        "status": first_chunk.get("status", ""),
-        "language": first_chunk.get("language", ""),
-        "tags": first_chunk.get("tags", []),
-        "directory_group": first_chunk.get("directory_group", ""),
-        "source_file": first_chunk.get("source_file", ""),
-        "checksum": first_chunk.get("checksum", ""),
-        "chunk_count": len(results)
+        **folder_metadata(record),
+        "directory_group": record.get("directory_group", ""),
+        "source_file": record.get("source_file", ""),
+        "checksum": record.get("checksum", ""),
+        "chunk_count": record.get("chunk_count", 0)
     }
 
-    logger.info(f"Retrieved metadata: {path_document} ({len(results)} chunks)")
+    logger.info(f"Retrieved metadata: {path_document} ({metadata['chunk_count']} chunks)")
 
     return metadata
 
@@ -339,10 +750,13 @@ if __name__ == "__main__":
 
     # Run MCP server with HTTP transport (bind to 0.0.0.0 for Docker)
     logger.info("Starting Agentix Context Library MCP Server...")
-    mcp.run(
-        transport="http",
-        host="0.0.0.0",
-        port=8000,
-        path="/mcp",
-        log_level="info"
-    )
+    try:
+        mcp.run(
+            transport="http",
+            host="0.0.0.0",
+            port=8000,
+            path="/mcp",
+            log_level="info"
+        )
+    finally:
+        inference_executor.shutdown()
@@ -0,0 +1,121 @@
+"""
+Compare the ONNX embedding backend against the torch backend.
+
+Embeds chunks of the context registry with both backends and reports
+throughput and cosine agreement. Exits non-zero when the ONNX vectors
+drift below --min-cosine, so the ONNX backend is only adopted when
+retrieval quality holds.
+
+Usage:
+    python benchmark_embeddings.py --onnx-model-path /models/bge-m3-onnx [--quantize]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from chunker import MarkdownChunker
+from embedder import Embedder
+from scanner import Scanner
+
+logger = logging.getLogger(__name__)
+
+
+def load_texts(context_root: str, limit: int) -> List[str]:
+    """Chunk registry documents until `limit` chunk texts are collected."""
+    chunker = MarkdownChunker()
+    texts: List[str] = []
+    for doc_info in Scanner(context_root).iter_documents():
+        chunks = chunker.chunk_document(doc_info.load_content(), doc_info.relative_path)
+        texts.extend(chunk.text for chunk in chunks)
+        doc_info.release_content()
+        if len(texts) >= limit:
+            break
+    return texts[:limit]
+
+
+def timed(embed: Callable[[List[str]], List[List[float]]], texts: List[str]) -> Tuple[np.ndarray, float]:
+    """Embed texts; returns (vectors, texts per second)."""
+    embed(texts[:8])  # Warm-up
+    started = time.perf_counter()
+    vectors = np.asarray(embed(texts), dtype=np.float32)
+    return vectors, len(texts) / (time.perf_counter() - started)
+
+
+def main() -> int:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--onnx-model-path", required=True, help="Directory of the exported ONNX model")
+    parser.add_argument("--onnx-model-file", default="model.onnx", help="ONNX file to benchmark")
+    parser.add_argument("--quantize", action="store_true", help="Write and benchmark an int8 copy of the model")
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime intra-op threads (0 = default)")
+    parser.add_argument("--model", default=os.getenv("EMBEDDING_MODEL", "BAAI/bge-m3"))
+    parser.add_argument("--context-root", default=os.getenv("CONTEXT_ROOT", "/data/context-registry"))
+    parser.add_argument("--texts", type=int, default=256, help="Number of chunks to embed")
+    parser.add_argument("--encode-batch-tokens", type=int, default=int(os.getenv("ENCODE_BATCH_TOKENS", "16384")),
+                        help="Padded token budget per forward pass (0 = fixed --batch-size batches)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Batch size when --encode-batch-tokens is 0")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Lowest acceptable cosine agreement")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    texts = load_texts(args.context_root, args.texts)
+    if not texts:
+        logger.error(f"No chunks found in {args.context_root}")
+        return 1
+
+    onnx_model_file = args.onnx_model_file
+    if args.quantize:
+        from onnx_backend import quantize_model
+        onnx_model_file = quantize_model(args.onnx_model_path, source_file=args.onnx_model_file).name
+
+    torch_embedder = Embedder(
+        model_name=args.model,
+        batch_size=args.batch_size,
+        encode_batch_tokens=args.encode_batch_tokens,
+    )
+    torch_embedder.load_model()
+    onnx_embedder = Embedder(
+        model_name=args.model,
+        batch_size=args.batch_size,
+        encode_batch_tokens=args.encode_batch_tokens,
+        backend="onnx",
+        onnx_model_path=args.onnx_model_path,
+        onnx_model_file=onnx_model_file,
+        onnx_threads=args.threads,
+    )
+    onnx_embedder.load_model()
+
+    torch_vectors, torch_rate = timed(torch_embedder.embed_texts, texts)
+    onnx_vectors, onnx_rate = timed(onnx_embedder.embed_texts, texts)
+
+    # Both backends return L2-normalized vectors
+    cosines = np.sum(torch_vectors * onnx_vectors, axis=1)
+
+    if args.encode_batch_tokens > 0:
+        batching = f"token budget {args.encode_batch_tokens}"
+    else:
+        batching = f"batch size {args.batch_size}"
+    logger.info(f"Texts: {len(texts)} ({batching})")
+    logger.info(f"torch: {torch_rate:.1f} texts/s")
+    logger.info(f"onnx ({onnx_model_file}, threads {args.threads or 'auto'}): "
+                f"{onnx_rate:.1f} texts/s ({onnx_rate / torch_rate:.2f}x)")
+    logger.info(f"Cosine agreement: min {cosines.min():.4f}, p1 {np.percentile(cosines, 1):.4f}, "
+                f"mean {cosines.mean():.4f}")
+
+    if cosines.min() < args.min_cosine:
+        logger.warning(f"ONNX vectors below --min-cosine {args.min_cosine}; keep EMBEDDING_BACKEND=torch")
+        return 1
+
+    logger.info(f"Parity holds; set EMBEDDING_BACKEND=onnx ONNX_MODEL_FILE={onnx_model_file} to adopt")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
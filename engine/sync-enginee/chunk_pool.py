@@ -0,0 +1,102 @@
+"""Optional multi-process chunking."""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import logging
+import multiprocessing
+import threading
+
+from chunker import Chunk, MarkdownChunker
+
+logger = logging.getLogger(__name__)
+
+# Chunker of the current worker process
+_worker_chunker: Optional[MarkdownChunker] = None
+
+
+def _init_worker(chunk_size: int, chunk_overlap: int, min_chunk_size: int) -> None:
+    """Create the worker process's chunker (tokenizer is loaded once per process)."""
+    global _worker_chunker
+    _worker_chunker = MarkdownChunker(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        min_chunk_size=min_chunk_size,
+    )
+
+
+def _chunk_in_worker(content: str, path_document: str) -> List[Tuple[str, str, int]]:
+    """Chunk one document; returns compact (text, header_context, token_count) tuples."""
+    chunks = _worker_chunker.chunk_document(content, path_document)
+    return [(chunk.text, chunk.header_context, chunk.token_count) for chunk in chunks]
+
+
+class ChunkProcessPool:
+    """
+    Drop-in replacement for `MarkdownChunker.chunk_document` that chunks
+    in a pool of worker processes.
+
+    Chunking is pure-Python and holds the GIL, so threads alone keep it on
+    one core. The pool is only started once more than `min_documents`
+    documents have been chunked; small runs stay in-process and never pay
+    the process startup cost.
+    """
+
+    def __init__(
+        self,
+        chunker: MarkdownChunker,
+        processes: int,
+        min_documents: int = 50,
+    ):
+        """
+        Initialize pool.
+
+        Args:
+            chunker: In-process chunker, also defines the workers' settings
+            processes: Number of worker processes
+            min_documents: Documents chunked in-process before the pool starts
+        """
+        self.chunker = chunker
+        self.processes = max(1, processes)
+        self.min_documents = max(0, min_documents)
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._documents = 0
+        self._lock = threading.Lock()
+
+    def chunk_document(self, content: str, path_document: str) -> List[Chunk]:
+        """Chunk a document in a worker process (or in-process for small runs)."""
+        pool = self._get_pool()
+        if pool is None:
+            return self.chunker.chunk_document(content, path_document)
+
+        compact = pool.submit(_chunk_in_worker, content, path_document).result()
+        return [
+            Chunk(text=text, chunk_index=i, header_context=header_context, token_count=token_count)
+            for i, (text, header_context, token_count) in enumerate(compact)
+        ]
+
+    def shutdown(self) -> None:
+        """Stop worker processes, if they were started."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Count a document and return the pool once the run is large enough."""
+        with self._lock:
+            self._documents += 1
+            if self._pool is None and self._documents > self.min_documents:
+                logger.info(f"Starting chunking pool with {self.processes} processes")
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    # Spawn: forking a process with live threads is unsafe
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(
+                        self.chunker.chunk_size,
+                        self.chunker.chunk_overlap,
+                        self.chunker.min_chunk_size,
+                    ),
+                )
+            return self._pool
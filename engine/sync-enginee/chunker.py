@@ -1,14 +1,20 @@
 """Chunking module for splitting markdown documents."""
 
-from typing import List
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from bisect import bisect_left, bisect_right
+import hashlib
 import logging
+import re
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import numpy as np
 import tiktoken
 
 logger = logging.getLogger(__name__)
 
+# tiktoken encoding name -> byte length per token id
+_TOKEN_BYTE_LENGTHS: Dict[str, np.ndarray] = {}
+
 
 @dataclass
 class Chunk:
@@ -16,11 +22,194 @@ class Chunk:
     text: str
     chunk_index: int
     header_context: str  # Header hierarchy for context
+    token_count: int = 0  # Approximate size, used to size embedding batches
+    
+    @property
+    def content_hash(self) -> str:
+        """SHA256 of the embedded text; equal hashes can share a vector."""
+        return hashlib.sha256(self.text.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class MarkdownSection:
+    """A heading and everything up to the next heading of the same or higher level."""
+    start: int  # Offset of the heading line (0 for the document root)
+    level: int  # 1-6 for headings, 0 for the document root
+    breadcrumb: str  # Heading path, e.g. "Auth > Keycloak > Setup"
+    end: int = 0  # End of the section including subsections
+    body_end: int = 0  # End of the text before the first subsection
+    children: List["MarkdownSection"] = field(default_factory=list)
+
+
+# ATX heading, e.g. "## Setup" or "## Setup ##"
+_HEADING_PATTERN = re.compile(r' {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t\r]*$')
+# Opening or closing code fence, e.g. "```bash" or "~~~"
+_FENCE_PATTERN = re.compile(r' {0,3}(`{3,}|~{3,})(.*)$')
+
+
+def parse_sections(text: str, max_breadcrumb_depth: int = 3) -> List[MarkdownSection]:
+    """
+    Build the heading tree of a markdown document in one pass.
+    
+    Headings inside fenced code blocks are ignored. Breadcrumbs list the
+    titles from the outermost heading down to the section's own heading,
+    keeping the innermost `max_breadcrumb_depth` of them.
+    
+    Returns:
+        All sections in document order; the first one is the document root
+    """
+    root = MarkdownSection(start=0, level=0, breadcrumb="")
+    sections = [root]
+    stack = [root]
+    titles: List[str] = []  # Titles along the stack, root excluded
+    fence: Optional[str] = None
+    
+    position = 0
+    length = len(text)
+    while position < length:
+        line_end = text.find("\n", position)
+        if line_end == -1:
+            line_end = length
+        line = text[position:line_end]
+        
+        fence_match = _FENCE_PATTERN.match(line) if "`" in line or "~" in line else None
+        if fence is not None:
+            # Closing fence: same character, at least as long, no info string
+            if fence_match and fence_match.group(1)[0] == fence[0] \
+                    and len(fence_match.group(1)) >= len(fence) and not fence_match.group(2).strip():
+                fence = None
+        elif fence_match and not (fence_match.group(1)[0] == "`" and "`" in fence_match.group(2)):
+            fence = fence_match.group(1)
+        elif line.lstrip(" ").startswith("#"):
+            heading = _HEADING_PATTERN.match(line)
+            if heading:
+                level = len(heading.group(1))
+                title = (heading.group(2) or "").strip()
+                
+                while stack[-1].level >= level:
+                    stack.pop().end = position
+                    titles.pop()
+                
+                parent = stack[-1]
+                if not parent.children:
+                    parent.body_end = position
+                
+                titles.append(title)
+                section = MarkdownSection(
+                    start=position,
+                    level=level,
+                    breadcrumb=" > ".join([t for t in titles if t][-max_breadcrumb_depth:]),
+                )
+                parent.children.append(section)
+                stack.append(section)
+                sections.append(section)
+        
+        position = line_end + 1
+    
+    for section in stack:
+        section.end = length
+    for section in sections:
+        if not section.children:
+            section.body_end = section.end
+    
+    return sections
+
+
+class TokenOffsets:
+    """
+    Token boundaries of a document, computed with a single encode.
+    
+    The token count of any character span is derived from the offset arrays
+    with two binary searches instead of re-encoding the substring.
+    """
+    
+    def __init__(self, text: str, tokenizer=None):
+        """
+        Tokenize text once.
+        
+        Args:
+            text: Full document text
+            tokenizer: tiktoken encoding, or None for the 4-chars-per-token approximation
+        """
+        self.tokenizer = tokenizer
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        
+        if tokenizer is not None and text:
+            self.starts = self._char_offsets(text, tokenizer.encode(text))
+            # Tokens are contiguous: each ends where the next one starts
+            self.ends = self.starts[1:] + [len(text)]
+        
+        self._starts_array = np.asarray(self.starts, dtype=np.int64)
+        self._ends_array = np.asarray(self.ends, dtype=np.int64)
+    
+    def count(self, start: int, end: int) -> int:
+        """Number of tokens overlapping text[start:end]."""
+        if end <= start:
+            return 0
+        if self.tokenizer is None:
+            # Fallback: approximate 4 chars = 1 token
+            return (end - start) // 4
+        
+        first = bisect_right(self.ends, start)
+        last = bisect_left(self.starts, end)
+        return max(0, last - first)
+    
+    def count_many(self, spans: List[Tuple[int, int]]) -> List[int]:
+        """Token counts of many (start, end) spans in one vectorized pass."""
+        if not spans:
+            return []
+        bounds = np.asarray(spans, dtype=np.int64)
+        if self.tokenizer is None:
+            return ((bounds[:, 1] - bounds[:, 0]) // 4).tolist()
+        
+        first = np.searchsorted(self._ends_array, bounds[:, 0], side="right")
+        last = np.searchsorted(self._starts_array, bounds[:, 1], side="left")
+        return np.maximum(last - first, 0).tolist()
+    
+    def _char_offsets(self, text: str, token_ids: List[int]) -> List[int]:
+        """
+        Character offset at which each token starts.
+        
+        A token starting inside a multi-byte UTF-8 character is assigned
+        that character's offset.
+        """
+        data = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+        # Index of the character each byte belongs to (continuation bytes are 0b10xxxxxx)
+        char_of_byte = np.cumsum((data & 0xC0) != 0x80) - 1
+        
+        token_lengths = _token_byte_lengths(self.tokenizer)[np.asarray(token_ids[:-1], dtype=np.int64)]
+        byte_starts = np.zeros(len(token_ids), dtype=np.int64)
+        np.cumsum(token_lengths, out=byte_starts[1:])
+        return char_of_byte[byte_starts].tolist()
+
+
+def _token_byte_lengths(tokenizer) -> np.ndarray:
+    """Byte length of every token id of a tiktoken encoding (cached per encoding)."""
+    lengths = _TOKEN_BYTE_LENGTHS.get(tokenizer.name)
+    if lengths is None:
+        lengths = np.zeros(tokenizer.n_vocab, dtype=np.int64)
+        for token_id in range(tokenizer.n_vocab):
+            try:
+                lengths[token_id] = len(tokenizer.decode_single_token_bytes(token_id))
+            except KeyError:
+                pass  # Unused id
+        _TOKEN_BYTE_LENGTHS[tokenizer.name] = lengths
+    return lengths
 
 
 class MarkdownChunker:
     """Chunks markdown documents using recursive strategy."""
     
+    # Separators for text within one section, tried in order
+    # (sections themselves are split along the heading tree)
+    SEPARATORS = [
+        "\n\n",      # Paragraphs
+        "\n",        # Lines
+        " ",         # Words
+        "",          # Characters
+    ]
+    
     def __init__(
         self,
         chunk_size: int = 512,
@@ -39,29 +228,18 @@ class MarkdownChunker:
         except Exception as e:
             logger.warning(f"Failed to load tiktoken encoder: {e}. Using char-based approximation.")
             self.tokenizer = None
-        
-        # Create LangChain text splitter with markdown-aware separators
-        self.splitter = RecursiveCharacterTextSplitter(
-            separators=[
-                "\n# ",      # H1 headers
-                "\n## ",     # H2 headers
-                "\n### ",    # H3 headers
-                "\n#### ",   # H4 headers
-                "\n\n",      # Paragraphs
-                "\n",        # Lines
-                " ",         # Words
-                "",          # Characters
-            ],
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=self._token_length,
-            is_separator_regex=False,
-        )
     
     def chunk_document(self, content: str, path_document: str) -> List[Chunk]:
         """
         Chunk markdown document using recursive strategy.
         
+        The document is tokenized and its heading tree parsed once. Sections
+        that fit in a chunk are kept whole; larger ones are split into their
+        subsections, then by paragraphs, lines and words. All size checks
+        work on character spans measured against the single tokenization.
+        Each chunk's header_context is the heading path of the section it
+        starts in.
+        
         Args:
             content: Markdown content to chunk
             path_document: Document path for logging
@@ -69,83 +247,216 @@ class MarkdownChunker:
         Returns:
             List of Chunk objects
         """
-        # Split using LangChain
-        raw_chunks = self.splitter.split_text(content)
+        tokens = TokenOffsets(content, self.tokenizer)
+        sections = parse_sections(content)
+        section_starts = [section.start for section in sections]
+        raw_spans = self._split_section(content, tokens, sections[0])
+        
+        def header_context(start: int) -> str:
+            """Breadcrumb of the section containing offset `start`."""
+            return sections[bisect_right(section_starts, start) - 1].breadcrumb
         
         # Process chunks: merge small ones, extract headers
         processed_chunks = []
         accumulated_text = ""
+        accumulated_tokens = 0
         chunk_index = 0
         
-        for raw_chunk in raw_chunks:
-            chunk_tokens = self._token_length(raw_chunk)
+        accumulated_start = 0
+        
+        for start, end in raw_spans:
+            raw_chunk = content[start:end]
+            chunk_tokens = tokens.count(start, end)
             
             # If chunk is too small, accumulate
             if chunk_tokens < self.min_chunk_size and accumulated_text:
                 accumulated_text += "\n\n" + raw_chunk
+                accumulated_tokens += chunk_tokens
                 continue
             
             # If we have accumulated text, process it first
             if accumulated_text:
-                header_ctx = self._extract_header_context(accumulated_text)
                 processed_chunks.append(Chunk(
                     text=accumulated_text,
                     chunk_index=chunk_index,
-                    header_context=header_ctx,
+                    header_context=header_context(accumulated_start),
+                    token_count=accumulated_tokens,
                 ))
                 chunk_index += 1
                 accumulated_text = ""
+                accumulated_tokens = 0
             
             # Process current chunk
             if chunk_tokens >= self.min_chunk_size:
-                header_ctx = self._extract_header_context(raw_chunk)
                 processed_chunks.append(Chunk(
                     text=raw_chunk,
                     chunk_index=chunk_index,
-                    header_context=header_ctx,
+                    header_context=header_context(start),
+                    token_count=chunk_tokens,
                 ))
                 chunk_index += 1
             else:
                 # Start accumulating
                 accumulated_text = raw_chunk
+                accumulated_tokens = chunk_tokens
+                accumulated_start = start
         
         # Don't forget last accumulated chunk
         if accumulated_text:
-            header_ctx = self._extract_header_context(accumulated_text)
             processed_chunks.append(Chunk(
                 text=accumulated_text,
                 chunk_index=chunk_index,
-                header_context=header_ctx,
+                header_context=header_context(accumulated_start),
+                token_count=accumulated_tokens,
             ))
         
         logger.info(f"Chunked {path_document}: {len(processed_chunks)} chunks")
         return processed_chunks
     
-    def _token_length(self, text: str) -> int:
-        """Calculate token count of text."""
-        if self.tokenizer:
-            return len(self.tokenizer.encode(text))
+    def _split_section(
+        self,
+        text: str,
+        tokens: TokenOffsets,
+        section: MarkdownSection,
+    ) -> List[Tuple[int, int]]:
+        """
+        Split a section into spans under chunk_size tokens.
+        
+        The section's own text and each subsection are pieces; small pieces
+        are merged with overlap, oversized subsections are split along their
+        own subsections and oversized text by SEPARATORS.
+        
+        Returns:
+            List of (start, end) character spans, whitespace-stripped
+        """
+        pieces: List[Tuple[int, int, Optional[MarkdownSection]]] = []
+        if section.start < section.body_end:
+            pieces.append((section.start, section.body_end, None))
+        pieces.extend((child.start, child.end, child) for child in section.children)
+        
+        final_spans: List[Tuple[int, int]] = []
+        good_pieces: List[Tuple[int, int, int]] = []
+        lengths = tokens.count_many([(a, b) for a, b, _ in pieces])
+        for (a, b, child), length in zip(pieces, lengths):
+            if length < self.chunk_size:
+                good_pieces.append((a, b, length))
+                continue
+            
+            if good_pieces:
+                final_spans.extend(self._merge_pieces(text, good_pieces))
+                good_pieces = []
+            if child is not None:
+                final_spans.extend(self._split_section(text, tokens, child))
+            else:
+                final_spans.extend(self._split_span(text, tokens, a, b, self.SEPARATORS))
+        
+        if good_pieces:
+            final_spans.extend(self._merge_pieces(text, good_pieces))
+        return final_spans
+    
+    def _split_span(
+        self,
+        text: str,
+        tokens: TokenOffsets,
+        start: int,
+        end: int,
+        separators: List[str],
+    ) -> List[Tuple[int, int]]:
+        """
+        Recursively split text[start:end] into spans under chunk_size tokens.
+        
+        Uses the first separator present in the span, keeping each separator
+        at the start of the piece that follows it. Pieces that are still too
+        large are split with the remaining separators; small neighbours are
+        merged with overlap.
+        
+        Returns:
+            List of (start, end) character spans, whitespace-stripped
+        """
+        # Get appropriate separator to use
+        separator = separators[-1]
+        new_separators: List[str] = []
+        for i, candidate in enumerate(separators):
+            if not candidate:
+                separator = candidate
+                break
+            if text.find(candidate, start, end) != -1:
+                separator = candidate
+                new_separators = separators[i + 1:]
+                break
+        
+        # Cut before every occurrence of the separator
+        if separator:
+            cuts = [start]
+            position = text.find(separator, start, end)
+            while position != -1:
+                cuts.append(position)
+                position = text.find(separator, position + len(separator), end)
+            cuts.append(end)
+            pieces = [(a, b) for a, b in zip(cuts, cuts[1:]) if a < b]
         else:
-            # Fallback: approximate 4 chars = 1 token
-            return len(text) // 4
+            pieces = [(i, i + 1) for i in range(start, end)]
+        
+        # Now go merging things, recursively splitting longer texts
+        final_spans: List[Tuple[int, int]] = []
+        good_pieces: List[Tuple[int, int, int]] = []
+        for (a, b), length in zip(pieces, tokens.count_many(pieces)):
+            if length < self.chunk_size:
+                good_pieces.append((a, b, length))
+                continue
+            
+            if good_pieces:
+                final_spans.extend(self._merge_pieces(text, good_pieces))
+                good_pieces = []
+            if not new_separators:
+                final_spans.append((a, b))
+            else:
+                final_spans.extend(self._split_span(text, tokens, a, b, new_separators))
+        
+        if good_pieces:
+            final_spans.extend(self._merge_pieces(text, good_pieces))
+        return final_spans
     
-    def _extract_header_context(self, text: str) -> str:
+    def _merge_pieces(
+        self,
+        text: str,
+        pieces: List[Tuple[int, int, int]],
+    ) -> List[Tuple[int, int]]:
         """
-        Extract header hierarchy from chunk text.
+        Combine adjacent (start, end, tokens) pieces into spans of up to chunk_size.
         
-        Example:
-            "# Auth\n## Keycloak\n### Setup\n..."
-            -> "Auth > Keycloak > Setup"
+        Consecutive spans share trailing pieces worth up to chunk_overlap tokens.
         """
-        headers = []
-        for line in text.split('\n'):
-            line = line.strip()
-            if line.startswith('#'):
-                # Extract header text
-                header_text = line.lstrip('#').strip()
-                if header_text:
-                    headers.append(header_text)
-        
-        if headers:
-            return " > ".join(headers[:3])  # Max 3 levels for context
-        return ""
+        spans: List[Tuple[int, int]] = []
+        window_start = 0  # Index of the first piece in the current span
+        total = 0
+        
+        for i, (_, _, length) in enumerate(pieces):
+            if total + length > self.chunk_size:
+                if total > self.chunk_size:
+                    logger.warning(
+                        f"Created a chunk of size {total}, which is longer than "
+                        f"the specified {self.chunk_size}"
+                    )
+                if window_start < i:
+                    spans.extend(self._strip_span(text, pieces[window_start][0], pieces[i - 1][1]))
+                    # Drop leading pieces until only the overlap remains
+                    while total > self.chunk_overlap or (
+                        total + length > self.chunk_size and total > 0
+                    ):
+                        total -= pieces[window_start][2]
+                        window_start += 1
+            total += length
+        
+        if window_start < len(pieces):
+            spans.extend(self._strip_span(text, pieces[window_start][0], pieces[-1][1]))
+        return spans
+    
+    @staticmethod
+    def _strip_span(text: str, start: int, end: int) -> List[Tuple[int, int]]:
+        """Trim whitespace off a span; returns [] if nothing is left."""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return [(start, end)] if start < end else []
@@ -16,6 +16,8 @@ class Config:
     
     # Qdrant settings (with defaults)
     collection_name: str = "context_library"
+    content_collection_name: str = ""  # Defaults to "<collection_name>_content"
+    catalog_collection_name: str = ""  # Defaults to "<collection_name>_catalog"
     vector_size: int = 1024
     distance_metric: str = "Cosine"
     
@@ -28,6 +30,28 @@ class Config:
     max_chunk_size: int = 8192  # BGE-M3 max tokens
     min_chunk_size: int = 50  # tokens to merge
     
+    # Pipeline concurrency
+    chunk_workers: int = 2  # chunking threads
+    chunk_processes: int = 0  # chunking worker processes (0 = chunk in-process)
+    chunk_process_min_documents: int = 50  # documents chunked in-process before the pool starts
+    upsert_workers: int = 2  # Qdrant upsert threads
+    pipeline_queue_size: int = 16  # documents buffered between stages
+    embed_batch_tokens: int = 16384  # token budget per cross-document embedding batch
+    encode_batch_tokens: int = 16384  # padded token budget per model forward pass (0 = fixed batches)
+    
+    # Embedding backend: "torch" or "onnx" (exported model run with ONNX Runtime)
+    embedding_backend: str = "torch"
+    onnx_model_path: str = ""  # directory of the exported model and tokenizer
+    onnx_model_file: str = "model.onnx"  # e.g. model_quantized.onnx for int8
+    onnx_threads: int = 0  # ONNX Runtime intra-op threads (0 = runtime default)
+    
+    # Persistent embedding cache ("" disables it)
+    embedding_cache_dir: str = ""
+    
+    # Persistent scan state for stat-based change detection ("" disables it)
+    scan_state_path: str = ""
+    scan_workers: int = 8  # threads for frontmatter parsing, reading and hashing
+    
     # Force sync mode
     force_sync: bool = False  # Force re-sync all documents regardless of checksum
     
@@ -42,9 +66,25 @@ class Config:
         return cls(
             qdrant_url=os.getenv("QDRANT_URL", "http://localhost:6333"),
             collection_name=os.getenv("COLLECTION_NAME", "context_library"),
+            content_collection_name=os.getenv("CONTENT_COLLECTION_NAME", ""),
+            catalog_collection_name=os.getenv("CATALOG_COLLECTION_NAME", ""),
             embedding_model=os.getenv("EMBEDDING_MODEL", "BAAI/bge-m3"),
             context_root=os.getenv("CONTEXT_ROOT", "/data/context-registry"),
             log_level=os.getenv("LOG_LEVEL", "INFO"),
+            chunk_workers=int(os.getenv("CHUNK_WORKERS", "2")),
+            chunk_processes=int(os.getenv("CHUNK_PROCESSES", "0")),
+            chunk_process_min_documents=int(os.getenv("CHUNK_PROCESS_MIN_DOCUMENTS", "50")),
+            upsert_workers=int(os.getenv("UPSERT_WORKERS", "2")),
+            pipeline_queue_size=int(os.getenv("PIPELINE_QUEUE_SIZE", "16")),
+            embed_batch_tokens=int(os.getenv("EMBED_BATCH_TOKENS", "16384")),
+            encode_batch_tokens=int(os.getenv("ENCODE_BATCH_TOKENS", "16384")),
+            embedding_backend=os.getenv("EMBEDDING_BACKEND", "torch").lower(),
+            onnx_model_path=os.getenv("ONNX_MODEL_PATH", ""),
+            onnx_model_file=os.getenv("ONNX_MODEL_FILE", "model.onnx"),
+            onnx_threads=int(os.getenv("ONNX_INTRA_OP_THREADS", "0")),
+            embedding_cache_dir=os.getenv("EMBEDDING_CACHE_DIR", ""),
+            scan_state_path=os.getenv("SCAN_STATE_PATH", ""),
+            scan_workers=int(os.getenv("SCAN_WORKERS", "8")),
             force_sync=force_sync,
         )
     
@@ -56,3 +96,7 @@ class Config:
             raise ValueError("EMBEDDING_MODEL must be set")
         if not os.path.exists(self.context_root):
             raise ValueError(f"Context root does not exist: {self.context_root}")
+        if self.embedding_backend not in ("torch", "onnx"):
+            raise ValueError(f"EMBEDDING_BACKEND must be 'torch' or 'onnx', got: {self.embedding_backend}")
+        if self.embedding_backend == "onnx" and not self.onnx_model_path:
+            raise ValueError("ONNX_MODEL_PATH must be set when EMBEDDING_BACKEND=onnx")
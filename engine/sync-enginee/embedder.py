@@ -1,35 +1,81 @@
 """Embedding module for BGE-M3 integration."""
 
-from typing import List
+from typing import List, Optional, Tuple
 import logging
 
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
+from embedding_cache import EmbeddingCache
+
 logger = logging.getLogger(__name__)
 
 
 class Embedder:
     """Handles text embedding using BGE-M3 model."""
     
-    def __init__(self, model_name: str = "BAAI/bge-m3", batch_size: int = 32):
+    # Texts shorter than this fraction of a batch's longest text start a new batch
+    BUCKET_RATIO = 0.8
+    
+    def __init__(
+        self,
+        model_name: str = "BAAI/bge-m3",
+        batch_size: int = 32,
+        cache_dir: Optional[str] = None,
+        backend: str = "torch",
+        onnx_model_path: Optional[str] = None,
+        onnx_model_file: str = "model.onnx",
+        onnx_threads: int = 0,
+        encode_batch_tokens: int = 16384,
+    ):
         """
         Initialize embedder with BGE-M3 model.
         
         Args:
             model_name: HuggingFace model identifier
-            batch_size: Batch size for embedding
+            batch_size: Batch size for embedding when encode_batch_tokens is 0
+            cache_dir: Directory of the persistent embedding cache (None disables it)
+            backend: "torch" (SentenceTransformer) or "onnx" (ONNX Runtime on CPU)
+            onnx_model_path: Directory of the exported ONNX model (onnx backend)
+            onnx_model_file: ONNX file to load, e.g. model_quantized.onnx for int8
+            onnx_threads: ONNX Runtime intra-op threads (0 = runtime default)
+            encode_batch_tokens: Padded token budget per forward pass; texts are
+                grouped by token length into batches under it (0 = fixed batch_size)
         """
+        if backend not in ("torch", "onnx"):
+            raise ValueError(f"Unsupported embedding backend: {backend}")
+        
         self.model_name = model_name
         self.batch_size = batch_size
+        self.backend = backend
+        self.onnx_model_path = onnx_model_path
+        self.onnx_model_file = onnx_model_file
+        self.onnx_threads = onnx_threads
+        self.encode_batch_tokens = encode_batch_tokens
         self.model = None
         self.vector_size = 1024  # BGE-M3 output dimension
+        self.cache: Optional[EmbeddingCache] = None
+        
+        if cache_dir:
+            # Quantized vectors differ slightly, so each backend/model file gets its own cache
+            cache_key = model_name if backend == "torch" else f"{model_name}@onnx/{onnx_model_file}"
+            self.cache = EmbeddingCache(cache_dir, cache_key, self.vector_size)
     
     def load_model(self) -> None:
         """Load BGE-M3 model into memory."""
-        logger.info(f"Loading embedding model: {self.model_name}")
+        logger.info(f"Loading embedding model: {self.model_name} ({self.backend} backend)")
         try:
-            self.model = SentenceTransformer(self.model_name)
+            if self.backend == "onnx":
+                # Imported lazily: onnxruntime is only needed for this backend
+                from onnx_backend import OnnxEncoder
+                
+                self.model = OnnxEncoder(
+                    self.onnx_model_path,
+                    model_file=self.onnx_model_file,
+                    intra_op_threads=self.onnx_threads,
+                )
+            else:
+                self.model = SentenceTransformer(self.model_name)
             logger.info(f"Model loaded successfully. Dimension: {self.vector_size}")
         except Exception as e:
             logger.error(f"Failed to load model: {e}")
@@ -39,35 +85,141 @@ class Embedder:
         """
         Embed multiple texts in batches.
         
+        Texts found in the embedding cache are not sent to the model;
+        newly computed vectors are added to the cache.
+        
         Args:
             texts: List of texts to embed
         
         Returns:
             List of embedding vectors (1024-dimensional)
         """
+        return self.embed_texts_with_cache_hits(texts)[0]
+    
+    def embed_texts_with_cache_hits(self, texts: List[str]) -> Tuple[List[List[float]], List[bool]]:
+        """
+        Embed texts like `embed_texts`, also reporting cache hits.
+        
+        Returns:
+            Tuple of (embedding vectors, per text: True if served from the cache)
+        """
         if not self.model:
             raise RuntimeError("Model not loaded. Call load_model() first.")
         
         if not texts:
-            return []
+            return [], []
+        
+        if self.cache is None:
+            return self._encode(texts), [False] * len(texts)
+        
+        embeddings = self.cache.get_many(texts)
+        cache_hits = [embedding is not None for embedding in embeddings]
+        missing = [i for i, hit in enumerate(cache_hits) if not hit]
         
+        if missing:
+            computed = self._encode([texts[i] for i in missing])
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+            
+            try:
+                self.cache.put_many([texts[i] for i in missing], computed)
+            except OSError as e:
+                logger.warning(f"Failed to write embedding cache: {e}")
+        
+        logger.debug(f"Embedded {len(texts)} texts ({len(texts) - len(missing)} from cache)")
+        return embeddings, cache_hits
+    
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        """
+        Run the model on texts.
+        
+        Texts are sorted by token length and encoded in batches of similar
+        length whose padded size (texts x longest text) stays under
+        encode_batch_tokens, so short chunks are not padded to the length of
+        long ones and get larger batches. Results are returned in input order.
+        """
         try:
-            # Embed in batches for better performance
-            embeddings = self.model.encode(
-                texts,
-                batch_size=self.batch_size,
-                show_progress_bar=len(texts) > 10,
-                convert_to_numpy=True,
-                normalize_embeddings=True,  # L2 normalization for cosine similarity
-            )
+            if self.encode_batch_tokens <= 0:
+                return self._encode_batch(texts, self.batch_size, show_progress_bar=len(texts) > 10)
+            
+            lengths = self._token_lengths(texts)
+            order = sorted(range(len(texts)), key=lambda i: lengths[i], reverse=True)
+            embeddings: List[Optional[List[float]]] = [None] * len(texts)
             
-            # Convert to list format for Qdrant
-            return embeddings.tolist()
+            batches = self._length_buckets(order, lengths)
+            for batch in batches:
+                for i, embedding in zip(batch, self._encode_batch([texts[i] for i in batch], len(batch))):
+                    embeddings[i] = embedding
+            
+            logger.debug(f"Encoded {len(texts)} texts in {len(batches)} length-bucketed batches")
+            return embeddings
         
         except Exception as e:
             logger.error(f"Embedding failed: {e}")
             raise
     
+    def _length_buckets(self, order: List[int], lengths: List[int]) -> List[List[int]]:
+        """
+        Group text indices, sorted longest first, into batches.
+        
+        The first (longest) text of a batch sets its padded length; a batch
+        ends when one more text would exceed encode_batch_tokens or when the
+        next text is shorter than BUCKET_RATIO of the longest, which bounds
+        padding per batch.
+        """
+        batches: List[List[int]] = []
+        batch: List[int] = []
+        padded_length = 0
+        for i in order:
+            if batch and (
+                (len(batch) + 1) * padded_length > self.encode_batch_tokens
+                or lengths[i] < padded_length * self.BUCKET_RATIO
+            ):
+                batches.append(batch)
+                batch = []
+            if not batch:
+                padded_length = max(1, lengths[i])
+            batch.append(i)
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _encode_batch(
+        self,
+        texts: List[str],
+        batch_size: int,
+        show_progress_bar: bool = False,
+    ) -> List[List[float]]:
+        """Encode texts with the model in batches of batch_size."""
+        embeddings = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=show_progress_bar,
+            convert_to_numpy=True,
+            normalize_embeddings=True,  # L2 normalization for cosine similarity
+        )
+        
+        # Convert to list format for Qdrant
+        return embeddings.tolist()
+    
+    def _token_lengths(self, texts: List[str]) -> List[int]:
+        """Model token count of each text, capped at the model's max length."""
+        tokenizer = getattr(self.model, "tokenizer", None)
+        max_length = getattr(self.model, "max_seq_length", None) or getattr(self.model, "max_length", None)
+        
+        if tokenizer is None:
+            # Fallback: approximate 4 chars = 1 token
+            lengths = [len(text) // 4 + 2 for text in texts]
+            return [min(length, max_length) for length in lengths] if max_length else lengths
+        
+        encoded = tokenizer(
+            texts,
+            truncation=max_length is not None,
+            max_length=max_length,
+            add_special_tokens=True,
+        )
+        return [len(input_ids) for input_ids in encoded["input_ids"]]
+    
     def embed_single(self, text: str) -> List[float]:
         """Embed a single text."""
         return self.embed_texts([text])[0]
@@ -0,0 +1,192 @@
+"""Persistent on-disk cache of chunk embeddings."""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import hashlib
+import logging
+import os
+import re
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Maps (model name, chunk text hash) to a float32 vector, across sync runs.
+
+    Each model gets its own directory holding two append-only files:
+
+        vectors.f32   raw float32 rows, `vector_size` values each
+        index.txt     one "<sha256 of text> <row>" line per cached vector
+
+    Vectors are read through a memory map, so opening the cache only loads
+    the index. Rows are written before their index lines; after a crash the
+    file may hold unreferenced rows, but never an index entry without its
+    vector.
+    """
+
+    VECTORS_FILE = "vectors.f32"
+    INDEX_FILE = "index.txt"
+
+    def __init__(self, cache_dir: str, model_name: str, vector_size: int):
+        """
+        Open (or create) the cache for one model.
+
+        Args:
+            cache_dir: Root directory of the cache
+            model_name: Embedding model identifier; vectors are never shared between models
+            vector_size: Embedding dimension
+        """
+        self.model_name = model_name
+        self.vector_size = vector_size
+        self.directory = Path(cache_dir) / self._model_directory(model_name)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._vectors_path = self.directory / self.VECTORS_FILE
+        self._index_path = self.directory / self.INDEX_FILE
+        self._index: Dict[str, int] = {}
+        self._rows = 0
+        self._mmap: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        self._load_index()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """Cache key of a chunk text."""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up cached vectors.
+
+        Returns:
+            One entry per text: the cached vector, or None on miss
+        """
+        keys = [self.text_hash(text) for text in texts]
+
+        with self._lock:
+            rows = [self._index.get(key) for key in keys]
+            found = sum(1 for row in rows if row is not None)
+            self.hits += found
+            self.misses += len(rows) - found
+
+            if not found:
+                return [None] * len(texts)
+
+            vectors = self._vectors()
+            return [vectors[row].tolist() if row is not None else None for row in rows]
+
+    def put_many(self, texts: List[str], embeddings: List[List[float]]) -> None:
+        """Append vectors for texts not yet in the cache."""
+        with self._lock:
+            new_keys: List[str] = []
+            seen: Set[str] = set()
+            new_vectors: List[List[float]] = []
+            for text, embedding in zip(texts, embeddings):
+                key = self.text_hash(text)
+                if key in self._index or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_vectors.append(embedding)
+
+            if not new_keys:
+                return
+
+            rows = np.asarray(new_vectors, dtype=np.float32)
+            if rows.shape[1] != self.vector_size:
+                raise ValueError(
+                    f"Expected {self.vector_size}-dimensional vectors, got {rows.shape[1]}"
+                )
+
+            # Vectors first, then index: an index line always points at a full row
+            with open(self._vectors_path, "ab") as f:
+                f.write(rows.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            with open(self._index_path, "a", encoding="utf-8") as f:
+                for offset, key in enumerate(new_keys):
+                    f.write(f"{key} {self._rows + offset}\n")
+
+            for offset, key in enumerate(new_keys):
+                self._index[key] = self._rows + offset
+            self._rows += len(new_keys)
+            self._mmap = None  # Remap to see the appended rows
+
+    def stats(self) -> Dict:
+        """Return entry count and hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _load_index(self) -> None:
+        """Read the index, dropping entries whose row is missing or truncated."""
+        row_bytes = self.vector_size * 4
+        size = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+        self._rows = size // row_bytes
+
+        if size % row_bytes:
+            # Partial row from an interrupted write: cut it off so appends stay aligned
+            logger.warning(f"Truncating partial vector row in {self._vectors_path}")
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(self._rows * row_bytes)
+
+        if not self._index_path.exists():
+            return
+
+        dropped = 0
+        with open(self._index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                # A line without newline may have been cut mid-number
+                if not line.endswith("\n") or len(parts) != 2 or not parts[1].isdigit():
+                    dropped += 1
+                    continue
+                row = int(parts[1])
+                if row < self._rows:
+                    self._index[parts[0]] = row
+                else:
+                    dropped += 1
+
+        if dropped:
+            # Rewrite without dangling entries, or they would point at rows appended later
+            logger.warning(f"Dropping {dropped} invalid entries from {self._index_path}")
+            tmp_path = self._index_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for key, row in self._index.items():
+                    f.write(f"{key} {row}\n")
+            os.replace(tmp_path, self._index_path)
+
+        logger.info(f"Embedding cache: {len(self._index)} vectors for {self.model_name}")
+
+    def _vectors(self) -> np.ndarray:
+        """Memory-mapped view of all stored rows."""
+        if self._mmap is None:
+            self._mmap = np.memmap(
+                self._vectors_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(self._rows, self.vector_size),
+            )
+        return self._mmap
+
+    @staticmethod
+    def _model_directory(model_name: str) -> str:
+        """Filesystem-safe, collision-free directory name for a model."""
+        slug = re.sub(r"[^A-Za-z0-9._-]+", "_", model_name).strip("_")
+        digest = hashlib.sha256(model_name.encode('utf-8')).hexdigest()[:8]
+        return f"{slug}-{digest}"
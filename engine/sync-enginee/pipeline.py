@@ -0,0 +1,301 @@
+"""Pipelined document processing: chunk -> embed -> upsert."""
+
+from typing import Callable, Iterable, List, Optional, Union
+from dataclasses import dataclass, field
+import logging
+import queue
+import threading
+
+from scanner import DocumentInfo
+from chunker import Chunk, MarkdownChunker
+from chunk_pool import ChunkProcessPool
+from embedder import Embedder
+from qdrant_manager import QdrantManager
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+@dataclass
+class DocumentTask:
+    """A document travelling through the pipeline."""
+    doc_info: DocumentInfo
+    is_new: bool
+    existing_checksum: Optional[str] = None
+    reuse_embeddings: bool = False  # Keep stored vectors of unchanged chunks
+    chunks: List[Chunk] = field(default_factory=list)
+    embeddings: List[Optional[List[float]]] = field(default_factory=list)
+    chunk_count: int = 0
+    reused_count: int = 0  # Chunks that kept their stored vector
+    cached_count: int = 0  # Chunks whose vector came from the embedding cache
+    error: Optional[Exception] = None
+
+
+class SyncPipeline:
+    """
+    Runs chunking, embedding and upserting as concurrent stages.
+
+    Stages are connected by bounded queues, so a slow stage applies
+    backpressure upstream instead of letting work pile up in memory:
+
+        producer -> [chunk workers] -> [embedder (1 thread)] -> [upsert workers]
+
+    The embedding model is owned by a single thread; chunking and Qdrant
+    upserts run on their own worker pools so network I/O overlaps with
+    model inference. The embedder fills each forward-pass batch with chunks
+    from as many documents as fit in the token budget, then splits the
+    vectors back out per document.
+
+    For updated documents, chunks whose hash matches a stored chunk keep
+    their stored vector; only new or edited chunks reach the model.
+    """
+    
+    # Max seconds the embedder waits for more documents to fill a batch
+    BATCH_FILL_TIMEOUT = 0.05
+
+    def __init__(
+        self,
+        chunker: Union[MarkdownChunker, ChunkProcessPool],
+        embedder: Embedder,
+        qdrant: QdrantManager,
+        on_complete: Callable[[DocumentTask], None],
+        chunk_workers: int = 2,
+        upsert_workers: int = 2,
+        queue_size: int = 16,
+        embed_batch_tokens: int = 16384,
+    ):
+        """
+        Initialize pipeline.
+
+        Args:
+            chunker: Markdown chunker, or a process pool wrapping one
+            embedder: Embedder with model loaded
+            qdrant: Connected Qdrant manager
+            on_complete: Called once per document (serialized) when it
+                finished, failed (`task.error`) or produced no chunks
+            chunk_workers: Number of chunking threads
+            upsert_workers: Number of Qdrant upsert threads
+            queue_size: Capacity of each inter-stage queue
+            embed_batch_tokens: Token budget per cross-document embedding batch
+        """
+        self.chunker = chunker
+        self.embedder = embedder
+        self.qdrant = qdrant
+        self.on_complete = on_complete
+        self.chunk_workers = max(1, chunk_workers)
+        self.upsert_workers = max(1, upsert_workers)
+        self.queue_size = max(1, queue_size)
+        self.embed_batch_tokens = max(1, embed_batch_tokens)
+
+        self._complete_lock = threading.Lock()
+
+    def run(self, tasks: Iterable[DocumentTask]) -> None:
+        """Process all tasks and block until every stage has drained."""
+        chunk_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        embed_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        upsert_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        stages = [
+            (chunk_queue, self._start_workers(
+                "chunk", self.chunk_workers, self._worker_loop, chunk_queue, embed_queue, self._chunk
+            )),
+            (embed_queue, self._start_workers(
+                "embed", 1, self._embed_loop, embed_queue, upsert_queue
+            )),
+            (upsert_queue, self._start_workers(
+                "upsert", self.upsert_workers, self._worker_loop, upsert_queue, None, self._upsert
+            )),
+        ]
+
+        try:
+            # Blocks while the chunk queue is full (backpressure)
+            for task in tasks:
+                chunk_queue.put(task)
+        finally:
+            # Shut stages down in order so every queued task is drained
+            for stage_queue, workers in stages:
+                for _ in workers:
+                    stage_queue.put(_DONE)
+                for worker in workers:
+                    worker.join()
+
+    def _start_workers(
+        self,
+        name: str,
+        count: int,
+        target: Callable,
+        *args,
+    ) -> List[threading.Thread]:
+        """Start `count` threads running `target(*args)`."""
+        workers = []
+        for i in range(count):
+            worker = threading.Thread(
+                target=target,
+                args=args,
+                name=f"sync-{name}-{i}",
+                daemon=True,
+            )
+            worker.start()
+            workers.append(worker)
+        return workers
+
+    def _worker_loop(
+        self,
+        in_queue: queue.Queue,
+        out_queue: Optional[queue.Queue],
+        handler: Callable[[DocumentTask], bool],
+    ) -> None:
+        """Process tasks until the stage is shut down."""
+        while True:
+            task = in_queue.get()
+            if task is _DONE:
+                return
+
+            try:
+                forward = handler(task)
+            except Exception as e:
+                task.error = e
+                forward = False
+
+            if forward:
+                out_queue.put(task)
+            else:
+                self._complete(task)
+
+    def _chunk(self, task: DocumentTask) -> bool:
+        """Chunk stage: split document into chunks and pick up reusable vectors."""
+        task.chunks = self.chunker.chunk_document(
+            content=task.doc_info.load_content(),
+            path_document=task.doc_info.relative_path,
+        )
+        if not task.chunks:
+            return False
+        
+        stored_vectors = {}
+        if task.reuse_embeddings:
+            try:
+                stored_vectors = self.qdrant.get_chunk_vectors(task.doc_info.relative_path)
+            except Exception as e:
+                logger.warning(f"Could not fetch stored vectors for {task.doc_info.relative_path}: {e}")
+        
+        task.embeddings = [stored_vectors.get(chunk.content_hash) for chunk in task.chunks]
+        task.reused_count = sum(1 for embedding in task.embeddings if embedding is not None)
+        return True
+
+    def _embed_loop(self, in_queue: queue.Queue, out_queue: queue.Queue) -> None:
+        """Embed stage: embed chunks of several documents per batch."""
+        done = False
+        
+        while not done:
+            task = in_queue.get()
+            if task is _DONE:
+                return
+            
+            if not self._pending_chunks(task):
+                # Every chunk reuses a stored vector
+                out_queue.put(task)
+                continue
+            
+            batch = [task]
+            tokens = self._task_tokens(task)
+            
+            # Top up the batch with queued documents until the budget is used
+            while tokens < self.embed_batch_tokens:
+                try:
+                    task = in_queue.get(timeout=self.BATCH_FILL_TIMEOUT)
+                except queue.Empty:
+                    break
+                if task is _DONE:
+                    done = True
+                    break
+                batch.append(task)
+                tokens += self._task_tokens(task)
+            
+            self._embed_batch(batch, tokens)
+            
+            for task in batch:
+                if task.error is None:
+                    out_queue.put(task)
+                else:
+                    self._complete(task)
+    
+    def _embed_batch(self, batch: List[DocumentTask], tokens: int) -> None:
+        """Embed pending chunks of a batch of documents and split vectors per document."""
+        pending = [self._pending_chunks(task) for task in batch]
+        texts = [task.chunks[i].text for task, indices in zip(batch, pending) for i in indices]
+        
+        try:
+            embeddings, cache_hits = self.embedder.embed_texts_with_cache_hits(texts)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].error = e
+                return
+            
+            # Isolate the failing document instead of failing the whole batch
+            logger.warning(f"Batch embedding failed ({e}), retrying per document")
+            for task, indices in zip(batch, pending):
+                try:
+                    vectors, task_hits = self.embedder.embed_texts_with_cache_hits(
+                        [task.chunks[i].text for i in indices]
+                    )
+                    self._fill_embeddings(task, indices, vectors, task_hits)
+                except Exception as task_error:
+                    task.error = task_error
+            return
+        
+        offset = 0
+        for task, indices in zip(batch, pending):
+            self._fill_embeddings(
+                task,
+                indices,
+                embeddings[offset:offset + len(indices)],
+                cache_hits[offset:offset + len(indices)],
+            )
+            offset += len(indices)
+        
+        logger.debug(f"Embedded {len(texts)} chunks from {len(batch)} documents (~{tokens} tokens)")
+    
+    @staticmethod
+    def _pending_chunks(task: DocumentTask) -> List[int]:
+        """Indices of chunks that still need an embedding."""
+        return [i for i, embedding in enumerate(task.embeddings) if embedding is None]
+    
+    @staticmethod
+    def _fill_embeddings(
+        task: DocumentTask,
+        indices: List[int],
+        vectors: List[List[float]],
+        cache_hits: List[bool],
+    ) -> None:
+        """Place freshly computed vectors at their chunk positions."""
+        for i, vector in zip(indices, vectors):
+            task.embeddings[i] = vector
+        task.cached_count += sum(cache_hits)
+    
+    @staticmethod
+    def _task_tokens(task: DocumentTask) -> int:
+        """Approximate token count of a document's chunks still to embed."""
+        return sum(
+            chunk.token_count
+            for chunk, embedding in zip(task.chunks, task.embeddings)
+            if embedding is None
+        )
+
+    def _upsert(self, task: DocumentTask) -> bool:
+        """Upsert stage: write points and document body to Qdrant."""
+        task.chunk_count = self.qdrant.upsert_chunks(task.doc_info, task.chunks, task.embeddings)
+        return False
+
+    def _complete(self, task: DocumentTask) -> None:
+        """Report a finished task; callbacks never run concurrently."""
+        with self._complete_lock:
+            try:
+                self.on_complete(task)
+            except Exception as e:
+                logger.error(f"Completion callback failed for {task.doc_info.relative_path}: {e}")
+        
+        # Body and vectors are stored; don't hold them while the run continues
+        task.doc_info.release_content()
+        task.embeddings = []
@@ -1,6 +1,8 @@
 """Qdrant client manager for vector database operations."""
 
 from typing import List, Dict, Optional, Set
+from dataclasses import dataclass
+from datetime import datetime, timezone
 import hashlib
 import logging
 import uuid
@@ -13,6 +15,10 @@ from qdrant_client.models import (
     Filter,
     FieldCondition,
     MatchValue,
+    MatchAny,
+    PayloadSchemaType,
+    Range,
+    PointIdsList,
 )
 
 from scanner import DocumentInfo
@@ -21,21 +27,50 @@ from chunker import Chunk
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class StoredDocument:
+    """State of a document currently stored in Qdrant."""
+    checksum: Optional[str]  # None if chunks disagree (partially written)
+    chunk_count: int
+
+
 class QdrantManager:
     """Manages Qdrant vector database operations."""
     
+    # Reserved point in the content collection holding the sync generation.
+    # The MCP server invalidates its caches whenever this value changes.
+    GENERATION_POINT_ID = str(uuid.uuid5(uuid.NAMESPACE_DNS, "__generation__"))
+    
+    # Payload fields filtered by the sync engine and the MCP server tools.
+    # Without an index every filtered scroll/search scans the whole collection.
+    PAYLOAD_INDEXES = {
+        "path_document": PayloadSchemaType.KEYWORD,
+        "directory_group": PayloadSchemaType.KEYWORD,
+        "status": PayloadSchemaType.KEYWORD,
+        "language": PayloadSchemaType.KEYWORD,
+        "tags": PayloadSchemaType.KEYWORD,
+        "chunk_index": PayloadSchemaType.INTEGER,
+    }
+    
     def __init__(
         self,
         qdrant_url: str,
         collection_name: str,
         vector_size: int = 1024,
         distance_metric: str = "Cosine",
+        content_collection_name: Optional[str] = None,
+        catalog_collection_name: Optional[str] = None,
     ):
         """Initialize Qdrant client."""
         self.qdrant_url = qdrant_url
         self.collection_name = collection_name
         self.vector_size = vector_size
         self.distance_metric = distance_metric
+        # Full document bodies live in a separate, vectorless collection
+        # keyed by content checksum, so chunk points stay small.
+        self.content_collection_name = content_collection_name or f"{collection_name}_content"
+        # One compact record per document, loaded by the MCP server into memory
+        self.catalog_collection_name = catalog_collection_name or f"{collection_name}_catalog"
         
         self.client = None
     
@@ -59,73 +94,129 @@ class QdrantManager:
             collections = self.client.get_collections().collections
             collection_names = [c.name for c in collections]
             
+            for aux_collection in (self.content_collection_name, self.catalog_collection_name):
+                if aux_collection not in collection_names:
+                    logger.info(f"Creating collection '{aux_collection}'")
+                    self.client.create_collection(
+                        collection_name=aux_collection,
+                        vectors_config={},
+                    )
+            
             if self.collection_name in collection_names:
                 logger.info(f"Collection '{self.collection_name}' already exists")
-                return
+            else:
+                # Create collection with schema
+                logger.info(f"Creating collection '{self.collection_name}'")
+                
+                # Map distance metric string to Qdrant enum
+                distance_map = {
+                    "Cosine": Distance.COSINE,
+                    "Euclidean": Distance.EUCLID,
+                    "Dot": Distance.DOT,
+                }
+                
+                self.client.create_collection(
+                    collection_name=self.collection_name,
+                    vectors_config=VectorParams(
+                        size=self.vector_size,
+                        distance=distance_map.get(self.distance_metric, Distance.COSINE),
+                    ),
+                )
+                
+                logger.info(f"Collection '{self.collection_name}' created successfully")
             
-            # Create collection with schema
-            logger.info(f"Creating collection '{self.collection_name}'")
+            # Also adds indexes missing on collections created by older versions
+            self.ensure_payload_indexes()
+        
+        except Exception as e:
+            logger.error(f"Failed to ensure collection exists: {e}")
+            raise
+    
+    def ensure_payload_indexes(self) -> int:
+        """
+        Create payload indexes for all filterable fields that lack one.
+        
+        Returns number of indexes created.
+        """
+        payload_schema = self.client.get_collection(self.collection_name).payload_schema or {}
+        created = 0
+        
+        for field_name, field_schema in self.PAYLOAD_INDEXES.items():
+            existing = payload_schema.get(field_name)
             
-            # Map distance metric string to Qdrant enum
-            distance_map = {
-                "Cosine": Distance.COSINE,
-                "Euclidean": Distance.EUCLID,
-                "Dot": Distance.DOT,
-            }
+            if existing is not None:
+                if existing.data_type != field_schema:
+                    logger.warning(
+                        f"Payload index '{field_name}' is {existing.data_type}, "
+                        f"expected {field_schema}"
+                    )
+                continue
             
-            self.client.create_collection(
+            logger.info(f"Creating payload index '{field_name}' ({field_schema})")
+            self.client.create_payload_index(
                 collection_name=self.collection_name,
-                vectors_config=VectorParams(
-                    size=self.vector_size,
-                    distance=distance_map.get(self.distance_metric, Distance.COSINE),
-                ),
+                field_name=field_name,
+                field_schema=field_schema,
+                wait=True,
             )
-            
-            logger.info(f"Collection '{self.collection_name}' created successfully")
+            created += 1
         
-        except Exception as e:
-            logger.error(f"Failed to ensure collection exists: {e}")
-            raise
+        return created
     
-    def get_document_checksum(self, path_document: str) -> Optional[str]:
+    def get_stored_documents(self) -> Dict[str, StoredDocument]:
         """
-        Get checksum of document from Qdrant if it exists.
+        Get checksum and chunk count of every document in one paged scroll.
         
-        Returns None if document doesn't exist in DB.
+        Only `path_document` and `checksum` are fetched (no vectors), so a
+        no-op sync costs a handful of requests instead of one per document.
         """
-        try:
-            # Query for any point with this path_document
-            results = self.client.scroll(
+        stored: Dict[str, StoredDocument] = {}
+        offset = None
+        
+        while True:
+            points, next_offset = self.client.scroll(
                 collection_name=self.collection_name,
-                scroll_filter=Filter(
-                    must=[
-                        FieldCondition(
-                            key="path_document",
-                            match=MatchValue(value=path_document),
-                        )
-                    ]
-                ),
-                limit=1,
+                limit=1000,
+                offset=offset,
+                with_payload=["path_document", "checksum"],
+                with_vectors=False,
             )
             
-            if results[0]:  # results is (points, next_page_offset)
-                return results[0][0].payload.get("checksum")
+            for point in points:
+                path = point.payload.get("path_document")
+                if not path:
+                    continue
+                
+                checksum = point.payload.get("checksum")
+                document = stored.get(path)
+                
+                if document is None:
+                    stored[path] = StoredDocument(checksum=checksum, chunk_count=1)
+                else:
+                    document.chunk_count += 1
+                    if document.checksum != checksum:
+                        document.checksum = None
             
-            return None
+            if next_offset is None:
+                break
+            offset = next_offset
         
-        except Exception as e:
-            logger.warning(f"     Error getting checksum for {path_document}: {e}")
-            return None
+        return stored
     
-    def delete_document_chunks(self, path_document: str) -> int:
+    def get_chunk_vectors(self, path_document: str) -> Dict[str, List[float]]:
         """
-        Delete all chunks for a document.
+        Fetch stored vectors of a document's chunks, keyed by chunk hash.
+        
+        Points written before chunk hashes were stored are left out.
         
-        Returns number of chunks deleted.
+        Returns:
+            Mapping chunk_hash -> vector
         """
-        try:
-            # Get all points for this document first to count
-            results = self.client.scroll(
+        vectors: Dict[str, List[float]] = {}
+        offset = None
+        
+        while True:
+            points, next_offset = self.client.scroll(
                 collection_name=self.collection_name,
                 scroll_filter=Filter(
                     must=[
@@ -135,30 +226,55 @@ class QdrantManager:
                         )
                     ]
                 ),
-                limit=1000,  # Should be enough for one document
+                limit=256,
+                offset=offset,
+                with_payload=["chunk_hash"],
+                with_vectors=True,
             )
             
-            count = len(results[0])
+            for point in points:
+                chunk_hash = point.payload.get("chunk_hash")
+                if chunk_hash and point.vector:
+                    vectors[chunk_hash] = point.vector
             
-            # Delete by filter
-            self.client.delete(
-                collection_name=self.collection_name,
-                points_selector=Filter(
-                    must=[
-                        FieldCondition(
-                            key="path_document",
-                            match=MatchValue(value=path_document),
-                        )
-                    ]
-                ),
-            )
-            
-            logger.debug(f"Deleted {count} chunks for {path_document}")
-            return count
+            if next_offset is None:
+                break
+            offset = next_offset
         
-        except Exception as e:
-            logger.error(f"Failed to delete chunks for {path_document}: {e}")
-            return 0
+        return vectors
+    
+    def delete_documents(self, paths: List[str], batch_size: int = 256) -> List[str]:
+        """
+        Delete all chunks of the given documents.
+        
+        Sends one filtered delete (match any path_document) per `batch_size`
+        paths instead of a scroll and delete per document.
+        
+        Returns:
+            Paths whose chunks were deleted; paths of failed batches are left out
+        """
+        deleted: List[str] = []
+        
+        for i in range(0, len(paths), batch_size):
+            batch = paths[i:i + batch_size]
+            try:
+                self.client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=Filter(
+                        must=[
+                            FieldCondition(
+                                key="path_document",
+                                match=MatchAny(any=batch),
+                            )
+                        ]
+                    ),
+                )
+                deleted.extend(batch)
+            except Exception as e:
+                logger.error(f"Failed to delete chunks for {len(batch)} documents: {e}")
+        
+        logger.debug(f"Deleted chunks for {len(deleted)} documents")
+        return deleted
     
     def upsert_chunks(
         self,
@@ -167,16 +283,18 @@ class QdrantManager:
         embeddings: List[List[float]],
     ) -> int:
         """
-        Upsert chunks for a document (delete old + insert new).
+        Upsert chunks for a document (overwrite in place + prune stale tail).
+        
+        Point IDs are derived from path and chunk index, so writing the new
+        chunks replaces the old ones with the same index. Chunks beyond the
+        new count are then removed in a single filtered delete. The document
+        stays searchable throughout.
         
         Returns number of chunks inserted.
         """
         if len(chunks) != len(embeddings):
             raise ValueError("Number of chunks and embeddings must match")
         
-        # First delete existing chunks
-        self.delete_document_chunks(doc_info.relative_path)
-        
         # Prepare points
         points = []
         for chunk, embedding in zip(chunks, embeddings):
@@ -194,8 +312,8 @@ class QdrantManager:
                 "source_file": doc_info.source_file,
                 "checksum": doc_info.checksum,
                 "chunk_index": chunk.chunk_index,
+                "chunk_hash": chunk.content_hash,
                 "chunk_text": chunk.text,
-                "full_content": doc_info.content if chunk.chunk_index == 0 else None,
                 "header_context": chunk.header_context,
                 **doc_info.metadata.to_dict(),  # title, version, status, language, tags
             }
@@ -216,40 +334,249 @@ class QdrantManager:
                 points=batch,
             )
         
+        # Remove chunks left over from a longer previous version
+        self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=Filter(
+                must=[
+                    FieldCondition(
+                        key="path_document",
+                        match=MatchValue(value=doc_info.relative_path),
+                    ),
+                    FieldCondition(
+                        key="chunk_index",
+                        range=Range(gte=len(points)),
+                    ),
+                ]
+            ),
+        )
+        
+        # Store full document body in the content collection
+        self.store_document_contents([doc_info])
+        
         logger.info(f"Upserted {len(points)} chunks for {doc_info.relative_path}")
         return len(points)
     
-    def get_all_document_paths(self) -> Set[str]:
-        """Get all unique path_document values from database."""
+    def store_document_contents(self, documents: List[DocumentInfo]) -> int:
+        """
+        Write document bodies to the content collection, keyed by checksum.
+        
+        Content is loaded per batch, so only one batch of bodies is held at a time.
+        Returns number of bodies written.
+        """
+        batch_size = 100
+        for i in range(0, len(documents), batch_size):
+            points = [
+                PointStruct(
+                    id=self._generate_content_id(doc_info.checksum),
+                    vector={},
+                    payload={
+                        "checksum": doc_info.checksum,
+                        "content": content,
+                        "size_bytes": len(content.encode("utf-8")),
+                    },
+                )
+                for doc_info in documents[i:i + batch_size]
+                for content in [doc_info.load_content()]
+            ]
+            self.client.upsert(
+                collection_name=self.content_collection_name,
+                points=points,
+            )
+        
+        return len(documents)
+    
+    def store_missing_contents(self, documents: List[DocumentInfo]) -> int:
+        """
+        Write bodies for documents whose checksum is not in the content store yet.
+        
+        Backfills unchanged documents synced before the content store existed.
+        Returns number of bodies written.
+        """
+        try:
+            by_id = {
+                self._generate_content_id(doc_info.checksum): doc_info
+                for doc_info in documents
+            }
+            
+            existing = set()
+            ids = list(by_id)
+            batch_size = 1000
+            for i in range(0, len(ids), batch_size):
+                points = self.client.retrieve(
+                    collection_name=self.content_collection_name,
+                    ids=ids[i:i + batch_size],
+                    with_payload=False,
+                    with_vectors=False,
+                )
+                existing.update(str(point.id) for point in points)
+            
+            missing = [doc_info for point_id, doc_info in by_id.items() if point_id not in existing]
+            if missing:
+                logger.info(f"Backfilling {len(missing)} document bodies into content store")
+                self.store_document_contents(missing)
+            return len(missing)
+        
+        except Exception as e:
+            logger.error(f"Failed to backfill content store: {e}")
+            return 0
+    
+    def prune_document_contents(self, live_checksums: Set[str]) -> int:
+        """
+        Delete content bodies no longer referenced by any document.
+        
+        Returns number of bodies deleted.
+        """
         try:
-            all_paths = set()
+            stale_ids = []
             offset = None
             
             while True:
-                results = self.client.scroll(
-                    collection_name=self.collection_name,
+                points, next_offset = self.client.scroll(
+                    collection_name=self.content_collection_name,
                     limit=1000,
                     offset=offset,
-                    with_payload=["path_document"],
+                    with_payload=["checksum"],
                     with_vectors=False,
                 )
                 
-                points, next_offset = results
-                
                 for point in points:
-                    path = point.payload.get("path_document")
-                    if path:
-                        all_paths.add(path)
+                    checksum = point.payload.get("checksum")
+                    if checksum is not None and checksum not in live_checksums:
+                        stale_ids.append(point.id)
                 
                 if next_offset is None:
                     break
                 offset = next_offset
             
-            return all_paths
+            if stale_ids:
+                self.client.delete(
+                    collection_name=self.content_collection_name,
+                    points_selector=PointIdsList(points=stale_ids),
+                )
+                logger.debug(f"Pruned {len(stale_ids)} stale document bodies")
+            
+            return len(stale_ids)
         
         except Exception as e:
-            logger.error(f"Failed to get document paths: {e}")
-            return set()
+            logger.error(f"Failed to prune content store: {e}")
+            return 0
+    
+    def get_catalog(self) -> Dict[str, Dict]:
+        """Get all published catalog records keyed by path_document."""
+        catalog = {}
+        offset = None
+        
+        while True:
+            points, next_offset = self.client.scroll(
+                collection_name=self.catalog_collection_name,
+                limit=1000,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            
+            for point in points:
+                path = point.payload.get("path_document")
+                if path:
+                    catalog[path] = point.payload
+            
+            if next_offset is None:
+                break
+            offset = next_offset
+        
+        return catalog
+    
+    def publish_catalog(
+        self,
+        records: Dict[str, Dict],
+        existing: Optional[Dict[str, Dict]] = None,
+    ) -> int:
+        """
+        Make the catalog collection match `records` (keyed by path_document).
+        
+        Only new or changed records are written; records for paths no longer
+        present are deleted. Returns number of records written or deleted.
+        """
+        if existing is None:
+            existing = self.get_catalog()
+        
+        changed = [
+            PointStruct(
+                id=self._generate_catalog_id(path),
+                vector={},
+                payload=record,
+            )
+            for path, record in records.items()
+            if existing.get(path) != record
+        ]
+        removed = [
+            self._generate_catalog_id(path)
+            for path in existing
+            if path not in records
+        ]
+        
+        batch_size = 100
+        for i in range(0, len(changed), batch_size):
+            self.client.upsert(
+                collection_name=self.catalog_collection_name,
+                points=changed[i:i + batch_size],
+            )
+        
+        if removed:
+            self.client.delete(
+                collection_name=self.catalog_collection_name,
+                points_selector=PointIdsList(points=removed),
+            )
+        
+        logger.debug(f"Catalog: {len(changed)} records written, {len(removed)} removed")
+        return len(changed) + len(removed)
+    
+    @staticmethod
+    def build_catalog_record(doc_info: DocumentInfo, chunk_count: int) -> Dict:
+        """Build the catalog record for a document."""
+        return {
+            "path_document": doc_info.relative_path,
+            "directory_group": doc_info.directory_group,
+            "source_file": doc_info.source_file,
+            "checksum": doc_info.checksum,
+            "chunk_count": chunk_count,
+            **doc_info.metadata.to_dict(),  # title, version, status, language, tags
+        }
+    
+    def get_generation(self) -> int:
+        """Get current sync generation (0 if never bumped)."""
+        points = self.client.retrieve(
+            collection_name=self.content_collection_name,
+            ids=[self.GENERATION_POINT_ID],
+            with_payload=["generation"],
+        )
+        if points:
+            return points[0].payload.get("generation", 0)
+        return 0
+    
+    def bump_generation(self) -> int:
+        """
+        Increment the sync generation marker.
+        
+        Returns the new generation.
+        """
+        generation = self.get_generation() + 1
+        self.client.upsert(
+            collection_name=self.content_collection_name,
+            points=[
+                PointStruct(
+                    id=self.GENERATION_POINT_ID,
+                    vector={},
+                    payload={
+                        "generation": generation,
+                        "updated_at": datetime.now(timezone.utc).isoformat(),
+                    },
+                )
+            ],
+        )
+        logger.debug(f"Bumped sync generation to {generation}")
+        return generation
     
     def get_total_points(self) -> int:
         """Get total number of points in collection."""
@@ -275,3 +602,17 @@ class QdrantManager:
         doc_uuid = uuid.uuid5(uuid.NAMESPACE_DNS, content)
         
         return str(doc_uuid)
+    
+    @staticmethod
+    def _generate_catalog_id(path_document: str) -> str:
+        """Generate catalog record ID as UUID from document path."""
+        return str(uuid.uuid5(uuid.NAMESPACE_DNS, f"catalog:{path_document}"))
+    
+    @staticmethod
+    def _generate_content_id(checksum: str) -> str:
+        """
+        Generate content store ID as UUID from document checksum.
+        
+        Identical documents share one stored body.
+        """
+        return str(uuid.uuid5(uuid.NAMESPACE_DNS, checksum))
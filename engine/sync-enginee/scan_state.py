@@ -0,0 +1,111 @@
+"""Persistent file stat cache for change detection without reading files."""
+
+from pathlib import Path
+from typing import Dict, Optional
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ScanState:
+    """
+    Remembers (mtime_ns, size, inode, checksum) per document between runs.
+
+    If a file's stat result still matches its recorded entry, its checksum
+    is taken from the state instead of reading and hashing the file. Only
+    entries seen during the current scan are written back, so deleted
+    documents drop out of the state automatically.
+    """
+
+    VERSION = 1
+
+    # Files modified this recently are not recorded: a further write within
+    # the filesystem's timestamp granularity could leave the stat unchanged
+    RACY_WINDOW_NS = 2_000_000_000
+
+    def __init__(self, path: str):
+        """
+        Initialize state backed by a JSON file.
+
+        Args:
+            path: State file location (created on first save)
+        """
+        self.path = Path(path)
+        self._previous: Dict[str, Dict] = {}
+        self._current: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Load the state file; a missing or unreadable file means an empty state."""
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable scan state {self.path}: {e}")
+            return
+
+        if data.get("version") != self.VERSION:
+            logger.info(f"Scan state {self.path} has an old format, rebuilding")
+            return
+
+        self._previous = data.get("files", {})
+        logger.info(f"Loaded scan state for {len(self._previous)} files")
+
+    def lookup(self, relative_path: str, stat: os.stat_result) -> Optional[str]:
+        """
+        Return the recorded checksum if the file is unchanged since last scan.
+
+        A hit also carries the entry over to the state written by `save`.
+        """
+        entry = self._previous.get(relative_path)
+        unchanged = entry is not None and entry == {**self._stat_entry(stat), "checksum": entry["checksum"]}
+
+        with self._lock:
+            if not unchanged:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._current[relative_path] = entry
+        return entry["checksum"]
+
+    def record(self, relative_path: str, stat: os.stat_result, checksum: str) -> None:
+        """Remember stat and checksum of a file that was read this run."""
+        if time.time_ns() - stat.st_mtime_ns < self.RACY_WINDOW_NS:
+            return
+        with self._lock:
+            self._current[relative_path] = {**self._stat_entry(stat), "checksum": checksum}
+
+    def save(self) -> None:
+        """Atomically write entries seen during this scan."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.VERSION, "files": self._current}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to save scan state {self.path}: {e}")
+            return
+
+        logger.info(
+            f"Scan state: {self.hits} files unchanged on disk, {self.misses} read and hashed"
+        )
+
+    @staticmethod
+    def _stat_entry(stat: os.stat_result) -> Dict:
+        """Fields of a stat result that identify a file version."""
+        return {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "inode": stat.st_ino,
+        }
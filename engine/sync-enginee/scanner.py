@@ -3,14 +3,18 @@
 import os
 import re
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Deque, Iterator, List, Dict, Optional, Tuple
 from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 import hashlib
 
 import frontmatter
 import yaml
 import logging
 
+from scan_state import ScanState
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,8 +47,25 @@ class DocumentInfo:
     directory_group: str  # Folder path for context expansion
     source_file: str  # Filename
     checksum: str  # SHA-256 of content
-    content: str  # Full markdown content
+    content: Optional[str]  # Full markdown content, None until loaded
     metadata: FolderMetadata  # Inherited from parent index.md
+    
+    def load_content(self) -> str:
+        """
+        Return document content, reading the file if it was not loaded yet.
+        
+        If the file changed since it was scanned, the checksum is updated
+        to match the content actually read.
+        """
+        if self.content is None:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                self.content = f.read()
+            self.checksum = hashlib.sha256(self.content.encode('utf-8')).hexdigest()
+        return self.content
+    
+    def release_content(self) -> None:
+        """Drop loaded content; `load_content` reads the file again if needed."""
+        self.content = None
 
 
 class Scanner:
@@ -54,11 +75,28 @@ class Scanner:
     VALID_STATUSES = {"draft", "stable", "deprecated"}
     VALID_LANGUAGES = {"id", "en"}
     
-    def __init__(self, context_root: str):
-        """Initialize scanner with context root path."""
+    def __init__(
+        self,
+        context_root: str,
+        state_path: Optional[str] = None,
+        workers: int = 8,
+    ):
+        """
+        Initialize scanner with context root path.
+        
+        Args:
+            context_root: Path of the context registry
+            state_path: Scan state file; files whose stat is unchanged since the
+                previous scan are not read or hashed (None disables it)
+            workers: Threads used for frontmatter parsing, reading and hashing
+        """
         self.context_root = Path(context_root)
         if not self.context_root.exists():
             raise ValueError(f"Context root does not exist: {context_root}")
+        
+        self.state = ScanState(state_path) if state_path else None
+        self.workers = max(1, workers)
+        self.errors: List[str] = []
     
     def scan(self) -> Tuple[List[DocumentInfo], List[str]]:
         """
@@ -67,27 +105,89 @@ class Scanner:
         Returns:
             Tuple of (valid_documents, errors)
         """
-        valid_documents = []
-        errors = []
+        valid_documents = list(self.iter_documents())
+        return valid_documents, self.errors
+    
+    def iter_documents(self) -> Iterator[DocumentInfo]:
+        """
+        Yield valid documents in sorted path order.
         
-        # Find all folders with index.md
-        for folder_path in self._find_folders_with_index():
-            try:
-                metadata = self._parse_index_metadata(folder_path)
-                documents = self._process_folder(folder_path, metadata)
-                valid_documents.extend(documents)
-            except Exception as e:
-                error_msg = f"Error processing folder {folder_path}: {str(e)}"
-                logger.error(error_msg)
-                errors.append(error_msg)
+        The tree is walked once; frontmatter parsing, file reads and hashing
+        then run on a thread pool of `workers` threads. Only a bounded window
+        of documents is in flight, so memory does not grow with registry size.
+        Folder errors are collected in `self.errors`; the scan state is saved
+        once the generator is exhausted.
+        """
+        self.errors = []
         
-        return valid_documents, errors
+        if self.state:
+            self.state.load()
+        
+        # Find all folders with index.md, together with their .md files
+        folders = self._walk_registry()
+        window_size = self.workers * 4
+        
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan") as pool:
+            metadata_futures = [
+                pool.submit(self._parse_index_metadata, folder_path)
+                for folder_path, _ in folders
+            ]
+            
+            window: Deque[Future] = deque()
+            for (folder_path, md_files), metadata_future in zip(folders, metadata_futures):
+                try:
+                    metadata = metadata_future.result()
+                except Exception as e:
+                    error_msg = f"Error processing folder {folder_path}: {str(e)}"
+                    logger.error(error_msg)
+                    self.errors.append(error_msg)
+                    continue
+                
+                for md_file in md_files:
+                    window.append(pool.submit(self._load_document, md_file, metadata))
+                    if len(window) >= window_size:
+                        doc_info = window.popleft().result()
+                        if doc_info is not None:
+                            yield doc_info
+            
+            while window:
+                doc_info = window.popleft().result()
+                if doc_info is not None:
+                    yield doc_info
+        
+        if self.state:
+            self.state.save()
     
-    def _find_folders_with_index(self) -> List[Path]:
-        """Find all folders containing index.md."""
+    def _walk_registry(self) -> List[Tuple[Path, List[Path]]]:
+        """
+        Find all folders containing index.md in a single directory walk.
+        
+        Returns:
+            Sorted list of (folder_path, .md files in that folder, including index.md)
+        """
         folders = []
-        for index_file in self.context_root.rglob("index.md"):
-            folders.append(index_file.parent)
+        pending = [str(self.context_root)]
+        
+        while pending:
+            directory = pending.pop()
+            md_files = []
+            
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.name.endswith(".md") and entry.is_file():
+                            md_files.append(entry.name)
+            except OSError as e:
+                logger.warning(f"Skipping unreadable directory {directory}: {e}")
+                continue
+            
+            if "index.md" in md_files:
+                folder_path = Path(directory)
+                folders.append((folder_path, [folder_path / name for name in sorted(md_files)]))
+        
+        folders.sort(key=lambda folder: folder[0])
         return folders
     
     def _parse_index_metadata(self, folder_path: Path) -> FolderMetadata:
@@ -148,41 +248,48 @@ class Scanner:
             folder_path=str(relative_folder),
         )
     
-    def _process_folder(self, folder_path: Path, metadata: FolderMetadata) -> List[DocumentInfo]:
-        """Process all .md files in a folder."""
-        documents = []
-        
-        # Find all .md files (including index.md)
-        md_files = list(folder_path.glob("*.md"))
-        
-        for md_file in md_files:
-            try:
-                doc_info = self._create_document_info(md_file, metadata)
-                documents.append(doc_info)
-                logger.info(f"Processed: {doc_info.relative_path}")
-            except Exception as e:
-                logger.warning(f"Skipping {md_file}: {e}")
-        
-        return documents
+    def _load_document(self, md_file: Path, metadata: FolderMetadata) -> Optional[DocumentInfo]:
+        """Create DocumentInfo for one file, or None if it is skipped."""
+        try:
+            doc_info = self._create_document_info(md_file, metadata)
+            logger.info(f"Processed: {doc_info.relative_path}")
+            return doc_info
+        except Exception as e:
+            logger.warning(f"Skipping {md_file}: {e}")
+            return None
     
     def _create_document_info(self, file_path: Path, metadata: FolderMetadata) -> DocumentInfo:
         """Create DocumentInfo from file."""
-        # Read content
+        relative_path = file_path.relative_to(self.context_root)
+        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception as e:
-            raise ValueError(f"Failed to read file: {e}")
+            stat = file_path.stat()
+        except OSError as e:
+            raise ValueError(f"Failed to stat file: {e}")
         
-        # Validate non-empty
-        if not content.strip():
-            raise ValueError("File is empty")
+        # Unchanged since last scan: reuse checksum, load content on demand
+        checksum = self.state.lookup(str(relative_path), stat) if self.state else None
+        content = None
         
-        # Calculate checksum
-        checksum = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        if checksum is None:
+            # Read content
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except Exception as e:
+                raise ValueError(f"Failed to read file: {e}")
+            
+            # Validate non-empty
+            if not content.strip():
+                raise ValueError("File is empty")
+            
+            # Calculate checksum
+            checksum = hashlib.sha256(content.encode('utf-8')).hexdigest()
+            
+            if self.state:
+                self.state.record(str(relative_path), stat, checksum)
         
         # Get paths
-        relative_path = file_path.relative_to(self.context_root)
         directory_group = metadata.folder_path
         source_file = file_path.name
         
@@ -4,18 +4,16 @@ import os
 import sys
 import logging
 from datetime import datetime
-from colorama import Fore, Style, init as init_colorama
+from typing import Dict, List, Set
 
 from config import Config
-from scanner import Scanner
-from chunker import MarkdownChunker
-from embedder import Embedder
-from qdrant_manager import QdrantManager
-from sync_report import SyncStats, SyncReporter
 
+# The remaining imports live in main(): chunking worker processes are
+# spawned, and spawn re-runs this module's top level in every worker. Keeping
+# it light means workers import only the chunker, not torch or qdrant_client.
 
-# Initialize colorama for colored output
-init_colorama(autoreset=True)
+# Unchanged documents checked against the content store per request
+SKIPPED_BACKFILL_BATCH = 1000
 
 
 def setup_logging(log_level: str ="INFO") -> None:
@@ -31,6 +29,18 @@ def setup_logging(log_level: str ="INFO") -> None:
 
 def main() -> int:
     """Main sync engine entry point."""
+    from colorama import Fore, Style, init as init_colorama
+    
+    from scanner import Scanner, DocumentInfo
+    from chunker import MarkdownChunker
+    from chunk_pool import ChunkProcessPool
+    from embedder import Embedder
+    from qdrant_manager import QdrantManager
+    from pipeline import SyncPipeline, DocumentTask
+    from sync_report import SyncStats, SyncReporter
+    
+    # Initialize colorama for colored output
+    init_colorama(autoreset=True)
     
     # Load configuration
     config = Config.from_env()
@@ -59,25 +69,34 @@ def main() -> int:
             collection_name=config.collection_name,
             vector_size=config.vector_size,
             distance_metric=config.distance_metric,
+            content_collection_name=config.content_collection_name,
+            catalog_collection_name=config.catalog_collection_name,
         )
         qdrant.connect()
         qdrant.ensure_collection_exists()
         
         # Step 2: Load embedding model
         logger.info(f"{Fore.YELLOW}[2/7] Loading embedding model...{Style.RESET_ALL}")
-        embedder = Embedder(model_name=config.embedding_model)
+        embedder = Embedder(
+            model_name=config.embedding_model,
+            cache_dir=config.embedding_cache_dir or None,
+            backend=config.embedding_backend,
+            onnx_model_path=config.onnx_model_path or None,
+            onnx_model_file=config.onnx_model_file,
+            onnx_threads=config.onnx_threads,
+            encode_batch_tokens=config.encode_batch_tokens,
+        )
         embedder.load_model()
         
         # Step 3: Scan context registry
         logger.info(f"{Fore.YELLOW}[3/7] Scanning context registry...{Style.RESET_ALL}")
-        scanner = Scanner(context_root=config.context_root)
-        documents, scan_errors = scanner.scan()
-        
-        # Record scan errors
-        stats.errors.extend(scan_errors)
-        stats.error_count = len(scan_errors)
-        
-        logger.info(f"Found {len(documents)} valid documents")
+        scanner = Scanner(
+            context_root=config.context_root,
+            state_path=config.scan_state_path or None,
+            workers=config.scan_workers,
+        )
+        # Documents are streamed from the scanner straight into the pipeline (step 5)
+        documents = scanner.iter_documents()
         
         # Step 4: Initialize chunker
         logger.info(f"{Fore.YELLOW}[4/7] Initializing chunker...{Style.RESET_ALL}")
@@ -86,86 +105,178 @@ def main() -> int:
             chunk_overlap=config.chunk_overlap,
             min_chunk_size=config.min_chunk_size,
         )
+        chunk_pool = None
+        if config.chunk_processes > 0:
+            chunk_pool = ChunkProcessPool(
+                chunker=chunker,
+                processes=config.chunk_processes,
+                min_documents=config.chunk_process_min_documents,
+            )
         
         # Step 5: Process documents
         logger.info(f"{Fore.YELLOW}[5/7] Processing documents...{Style.RESET_ALL}")
         
-        for doc_info in documents:
-            try:
+        # Prefetch checksums of all stored documents in one paged scroll
+        stored_documents = qdrant.get_stored_documents()
+        logger.info(f"Found {len(stored_documents)} documents in Qdrant")
+        
+        existing_catalog = qdrant.get_catalog()
+        
+        # Only paths, checksums and catalog records are kept for the whole run
+        fs_paths: Set[str] = set()
+        live_checksums: Set[str] = set()  # Bodies referenced by documents on disk
+        catalog_records: Dict[str, Dict] = {}
+        skipped_documents: List[DocumentInfo] = []  # Pending content store backfill
+        
+        def on_complete(task: DocumentTask) -> None:
+            """Record the outcome of one document (called serially by the pipeline)."""
+            path = task.doc_info.relative_path
+            
+            if task.error is not None:
+                stats.errors.append(f"{path}: {str(task.error)}")
+                stats.error_count += 1
+                if task.existing_checksum:
+                    # Qdrant still holds the previous version
+                    live_checksums.add(task.existing_checksum)
+                if path in existing_catalog:
+                    catalog_records[path] = existing_catalog[path]
+                logger.error(f"{Fore.RED}❌ Error processing {path}: {task.error}{Style.RESET_ALL}")
+                return
+            
+            if not task.chunks:
+                logger.warning(f"No chunks generated for {path}")
+                stats.warnings.append(f"No chunks: {path}")
+                return
+            
+            # Checksum may have been refreshed when content was loaded
+            live_checksums.add(task.doc_info.checksum)
+            catalog_records[path] = QdrantManager.build_catalog_record(task.doc_info, task.chunk_count)
+            
+            # Update stats
+            if task.is_new:
+                stats.added_files += 1
+                stats.added_chunks += task.chunk_count
+                logger.info(f"{Fore.GREEN}✅ Added: {path} ({task.chunk_count} chunks){Style.RESET_ALL}")
+            else:
+                stats.updated_files += 1
+                stats.updated_chunks += task.chunk_count
+                embedded_count = task.chunk_count - task.reused_count - task.cached_count
+                logger.info(
+                    f"{Fore.BLUE}🔄 Updated: {path} ({task.chunk_count} chunks, "
+                    f"{embedded_count} re-embedded, {task.cached_count} from cache){Style.RESET_ALL}"
+                )
+        
+        def backfill_skipped() -> None:
+            """Make sure unchanged documents also have their body in the content store."""
+            qdrant.store_missing_contents(skipped_documents)
+            for doc_info in skipped_documents:
+                doc_info.release_content()
+            skipped_documents.clear()
+        
+        def pending_tasks():
+            """Yield new or changed documents, skipping unchanged ones."""
+            for doc_info in documents:
+                fs_paths.add(doc_info.relative_path)
+                live_checksums.add(doc_info.checksum)
+                
                 # Check if document changed
-                existing_checksum = qdrant.get_document_checksum(doc_info.relative_path)
+                stored = stored_documents.get(doc_info.relative_path)
+                existing_checksum = stored.checksum if stored else None
                 
                 if existing_checksum == doc_info.checksum:
                     # Skip unchanged documents (unless --force is specified)
                     if not config.force_sync:
                         stats.skipped_files += 1
+                        catalog_records[doc_info.relative_path] = QdrantManager.build_catalog_record(
+                            doc_info, stored.chunk_count
+                        )
+                        doc_info.release_content()
+                        skipped_documents.append(doc_info)
+                        if len(skipped_documents) >= SKIPPED_BACKFILL_BATCH:
+                            backfill_skipped()
                         logger.info(f"{Fore.YELLOW}⏭️  Skipped (unchanged): {doc_info.relative_path}{Style.RESET_ALL}")
                         continue
                     else:
                         logger.info(f"{Fore.CYAN}🔄 Force updating: {doc_info.relative_path}{Style.RESET_ALL}")
                 
                 # Document is new or changed
-                is_new = existing_checksum is None
-                
-                # Chunk document
-                chunks = chunker.chunk_document(
-                    content=doc_info.content,
-                    path_document=doc_info.relative_path,
+                yield DocumentTask(
+                    doc_info=doc_info,
+                    is_new=stored is None,
+                    existing_checksum=existing_checksum,
+                    # --force re-embeds everything; normal updates keep unchanged chunks
+                    reuse_embeddings=stored is not None and not config.force_sync,
                 )
-                
-                if not chunks:
-                    logger.warning(f"No chunks generated for {doc_info.relative_path}")
-                    stats.warnings.append(f"No chunks: {doc_info.relative_path}")
-                    continue
-                
-                # Embed chunks
-                chunk_texts = [chunk.text for chunk in chunks]
-                embeddings = embedder.embed_texts(chunk_texts)
-                
-                # Upsert to Qdrant
-                chunk_count = qdrant.upsert_chunks(doc_info, chunks, embeddings)
-                
-                # Update stats
-                if is_new:
-                    stats.added_files += 1
-                    stats.added_chunks += chunk_count
-                    logger.info(f"{Fore.GREEN}✅ Added: {doc_info.relative_path} ({chunk_count} chunks){Style.RESET_ALL}")
-                else:
-                    stats.updated_files += 1
-                    stats.updated_chunks += chunk_count
-                    logger.info(f"{Fore.BLUE}🔄 Updated: {doc_info.relative_path} ({chunk_count} chunks){Style.RESET_ALL}")
-            
-            except Exception as e:
-                error_msg = f"{doc_info.relative_path}: {str(e)}"
-                stats.errors.append(error_msg)
-                stats.error_count += 1
-                logger.error(f"{Fore.RED}❌ Error processing {doc_info.relative_path}: {e}{Style.RESET_ALL}")
         
-        # Step 6: Orphan detection and cleanup
-        logger.info(f"{Fore.YELLOW}[6/7] Detecting orphaned documents...{Style.RESET_ALL}")
+        # Chunk, embed and upsert concurrently
+        pipeline = SyncPipeline(
+            chunker=chunk_pool or chunker,
+            embedder=embedder,
+            qdrant=qdrant,
+            on_complete=on_complete,
+            # One thread per worker process keeps the pool busy
+            chunk_workers=max(config.chunk_workers, config.chunk_processes),
+            upsert_workers=config.upsert_workers,
+            queue_size=config.pipeline_queue_size,
+            embed_batch_tokens=config.embed_batch_tokens,
+        )
+        try:
+            pipeline.run(pending_tasks())
+        finally:
+            if chunk_pool is not None:
+                chunk_pool.shutdown()
         
-        # Get all document paths from DB
-        db_paths = qdrant.get_all_document_paths()
+        if skipped_documents:
+            backfill_skipped()
         
-        # Get all document paths from filesystem
-        fs_paths = {doc_info.relative_path for doc_info in documents}
+        # Record scan errors
+        stats.errors.extend(scanner.errors)
+        stats.error_count += len(scanner.errors)
+        
+        logger.info(f"Found {len(fs_paths)} valid documents")
+        
+        if embedder.cache is not None:
+            cache_stats = embedder.cache.stats()
+            logger.info(
+                f"Embedding cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                f"({cache_stats['entries']} vectors stored)"
+            )
         
-        # Find orphans (in DB but not in filesystem)
-        orphan_paths = db_paths - fs_paths
+        # Step 6: Orphan detection and cleanup
+        logger.info(f"{Fore.YELLOW}[6/7] Detecting orphaned documents...{Style.RESET_ALL}")
+        
+        # Find orphans (in DB, prefetched in step 5, but not in filesystem)
+        orphan_paths = set(stored_documents) - fs_paths
         
         if orphan_paths:
             logger.info(f"Found {len(orphan_paths)} orphaned documents")
-            for orphan_path in orphan_paths:
-                try:
-                    deleted_count = qdrant.delete_document_chunks(orphan_path)
-                    stats.deleted_files += 1
-                    stats.deleted_chunks += deleted_count
-                    logger.info(f"{Fore.MAGENTA}🗑️  Deleted orphan: {orphan_path} ({deleted_count} chunks){Style.RESET_ALL}")
-                except Exception as e:
-                    logger.error(f"Failed to delete orphan {orphan_path}: {e}")
+            # Chunk counts come from the prefetch, so no per-document scroll is needed
+            for orphan_path in qdrant.delete_documents(sorted(orphan_paths)):
+                deleted_count = stored_documents[orphan_path].chunk_count
+                stats.deleted_files += 1
+                stats.deleted_chunks += deleted_count
+                logger.info(f"{Fore.MAGENTA}🗑️  Deleted orphan: {orphan_path} ({deleted_count} chunks){Style.RESET_ALL}")
         else:
             logger.info("No orphaned documents found")
         
+        # Drop document bodies no longer referenced by any document. Bodies of
+        # the previous catalog are kept one more generation: MCP servers keep
+        # serving it until they notice the generation bump.
+        retained_checksums = live_checksums | {
+            record.get("checksum") for record in existing_catalog.values() if record.get("checksum")
+        }
+        pruned_count = qdrant.prune_document_contents(retained_checksums)
+        if pruned_count:
+            logger.info(f"Pruned {pruned_count} stale document bodies from content store")
+        
+        # Publish document catalog for the MCP server
+        qdrant.publish_catalog(catalog_records, existing_catalog)
+        logger.info(f"Published catalog: {len(catalog_records)} documents")
+        
+        # Signal readers (MCP server caches) that the collection changed
+        generation = qdrant.bump_generation()
+        logger.info(f"Sync generation: {generation}")
+        
         # Step 7: Generate report
         logger.info(f"{Fore.YELLOW}[7/7] Generating sync report...{Style.RESET_ALL}")
         logger.info("")